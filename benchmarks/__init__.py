@@ -0,0 +1,17 @@
+"""
+Offline benchmarks and load tests for the front desk agent.
+
+Everything here runs without network access: the Google Calendar service is
+replaced by benchmarks.fake_calendar and the LLMs by benchmarks.fake_model.
+
+Usage:
+    uv run -m benchmarks.run_benchmarks
+"""
+
+import os
+
+# The agent modules read API keys at import time; nothing is sent with them.
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+os.environ.setdefault("ANTHROPIC_API_KEY", "offline-benchmark")
+# Keep LiteLLM from downloading its model cost map on import
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
@@ -0,0 +1,238 @@
+"""
+In-memory stand-in for the Google Calendar API service.
+
+Implements the subset of the googleapiclient service used by
+services/google_calendar.py:
+
+- events().list   with timeMin/timeMax, pagination and sync tokens
+- events().insert
+- freebusy().query
+- new_batch_http_request()
+
+Like the real API, inserts never check for conflicts, so overlapping
+bookings can be counted afterwards with double_bookings(). An optional
+latency is slept on every request to mimic network round trips.
+"""
+
+import itertools
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from services.calendar_events import parse_event_times
+from services.google_calendar import TIMEZONE
+
+
+def _parse_bound(value: str | None) -> datetime | None:
+    """Parse a timeMin/timeMax query bound to a naive datetime."""
+    if value is None:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+
+def synthetic_events(
+    start_date: datetime,
+    days: int,
+    events_per_day: int,
+    seed: int = 0,
+) -> list[dict]:
+    """
+    Generate event bodies spread over business hours.
+
+    Events start on the quarter hour between 8 AM and 6 PM and last 15 to 120
+    minutes, so some overlap and some spill outside business hours.
+    """
+    rng = random.Random(seed)
+    events = []
+    for day in range(days):
+        midnight = start_date.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=day)
+        for _ in range(events_per_day):
+            start = midnight + timedelta(minutes=8 * 60 + 15 * rng.randrange(40))
+            end = start + timedelta(minutes=15 * rng.randint(1, 8))
+            events.append({
+                'summary': 'Busy',
+                'start': {'dateTime': start.isoformat(), 'timeZone': TIMEZONE},
+                'end': {'dateTime': end.isoformat(), 'timeZone': TIMEZONE},
+            })
+    return events
+
+
+class _Request:
+    """A prepared API call; execute() runs it like an HttpRequest would."""
+
+    def __init__(self, service: 'FakeCalendarService', method: str, run):
+        self._service = service
+        self._method = method
+        self._run = run
+
+    def execute(self, num_retries: int = 0):
+        self._service._round_trip(self._method)
+        return self._run()
+
+
+class _Events:
+    def __init__(self, service: 'FakeCalendarService'):
+        self._service = service
+
+    def list(self, calendarId: str = 'primary', pageToken: str | None = None, maxResults: int = 250,
+             timeMin: str | None = None, timeMax: str | None = None, syncToken: str | None = None,
+             **params) -> _Request:
+        return _Request(
+            self._service, 'events.list',
+            lambda: self._service._list(calendarId, pageToken, maxResults, timeMin, timeMax, syncToken),
+        )
+
+    def insert(self, calendarId: str, body: dict, **params) -> _Request:
+        return _Request(self._service, 'events.insert', lambda: self._service._insert(calendarId, body))
+
+
+class _FreeBusy:
+    def __init__(self, service: 'FakeCalendarService'):
+        self._service = service
+
+    def query(self, body: dict) -> _Request:
+        return _Request(self._service, 'freebusy.query', lambda: self._service._freebusy(body))
+
+
+class _Batch:
+    """Stand-in for BatchHttpRequest: one round trip for all requests."""
+
+    def __init__(self, service: 'FakeCalendarService', callback):
+        self._service = service
+        self._callback = callback
+        self._requests: list[tuple[str, _Request]] = []
+
+    def add(self, request: _Request, request_id: str | None = None) -> None:
+        self._requests.append((request_id or str(len(self._requests)), request))
+
+    def execute(self) -> None:
+        self._service._round_trip('batch')
+        for request_id, request in self._requests:
+            try:
+                response, exception = request._run(), None
+            except Exception as e:
+                response, exception = None, e
+            self._callback(request_id, response, exception)
+
+
+class FakeCalendarService:
+    """Thread-safe in-memory calendars behind the googleapiclient call shape."""
+
+    def __init__(self, calendars: dict[str, list[dict]] | None = None, latency: float = 0.0):
+        """
+        Args:
+            calendars: Initial event bodies by calendar ID
+            latency: Seconds slept per request (and per batch) to mimic the network
+        """
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._events: dict[str, dict[str, dict]] = {}
+        self._changes: dict[str, list[tuple[int, dict]]] = {}  # Per calendar: (sequence, event)
+        self._sequence = 0
+        for calendar_id, events in (calendars or {}).items():
+            for body in events:
+                self._insert(calendar_id, body)
+
+    def _round_trip(self, method: str) -> None:
+        with self._lock:
+            self.calls[method] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    # --------- Service surface ----------
+
+    def events(self) -> _Events:
+        return _Events(self)
+
+    def freebusy(self) -> _FreeBusy:
+        return _FreeBusy(self)
+
+    def new_batch_http_request(self, callback=None) -> _Batch:
+        return _Batch(self, callback)
+
+    # --------- Behaviour ----------
+
+    def _insert(self, calendar_id: str, body: dict) -> dict:
+        with self._lock:
+            event_id = f"evt{next(self._ids)}"
+            event = dict(body, id=event_id, status='confirmed',
+                         htmlLink=f"https://calendar.example/event?eid={event_id}")
+            self._events.setdefault(calendar_id, {})[event_id] = event
+            self._sequence += 1
+            self._changes.setdefault(calendar_id, []).append((self._sequence, event))
+            return event
+
+    def _list(self, calendar_id, page_token, max_results, time_min, time_max, sync_token) -> dict:
+        with self._lock:
+            if sync_token is not None:
+                # Everything changed since the token was issued
+                since = int(sync_token)
+                items = [event for sequence, event in self._changes.get(calendar_id, []) if sequence > since]
+            else:
+                lower, upper = _parse_bound(time_min), _parse_bound(time_max)
+                items = []
+                for event in self._events.get(calendar_id, {}).values():
+                    start, end = parse_event_times(event)
+                    if (lower is None or end > lower) and (upper is None or start < upper):
+                        items.append((start, event))
+                items = [event for _, event in sorted(items, key=lambda item: item[0])]
+            sequence = self._sequence
+
+        offset = int(page_token or 0)
+        page = {'items': items[offset:offset + max_results]}
+        if offset + max_results < len(items):
+            page['nextPageToken'] = str(offset + max_results)
+        else:
+            page['nextSyncToken'] = str(sequence)
+        return page
+
+    def _freebusy(self, body: dict) -> dict:
+        lower, upper = _parse_bound(body['timeMin']), _parse_bound(body['timeMax'])
+        calendars = {}
+        with self._lock:
+            for item in body['items']:
+                periods = []
+                for event in self._events.get(item['id'], {}).values():
+                    start, end = parse_event_times(event)
+                    if end > lower and start < upper:
+                        periods.append((start, end))
+                calendars[item['id']] = {'busy': [
+                    {'start': start.isoformat(), 'end': end.isoformat()} for start, end in sorted(periods)
+                ]}
+        return {'calendars': calendars}
+
+    # --------- Inspection ----------
+
+    def event_count(self, calendar_id: str = 'primary') -> int:
+        with self._lock:
+            return len(self._events.get(calendar_id, {}))
+
+    def double_bookings(self, calendar_id: str = 'primary', summary_prefix: str = 'Appointment:') -> int:
+        """Count appointments (by summary prefix) that overlap an earlier-starting appointment."""
+        with self._lock:
+            intervals = sorted(
+                parse_event_times(event) for event in self._events.get(calendar_id, {}).values()
+                if event.get('summary', '').startswith(summary_prefix)
+            )
+        overlaps = 0
+        busy_until = None
+        for start, end in intervals:
+            if busy_until is not None and start < busy_until:
+                overlaps += 1
+            busy_until = end if busy_until is None else max(busy_until, end)
+        return overlaps
+
+
+def install_fake_calendar(service: FakeCalendarService) -> None:
+    """Route services.google_calendar through the fake service and reset its cache and mirror."""
+    from services import google_calendar
+    from services.availability_cache import availability_cache
+    from services.calendar_mirror import CalendarMirror
+
+    google_calendar.get_calendar_service = lambda: service
+    google_calendar.set_calendar_mirror(CalendarMirror(':memory:'))
+    availability_cache.invalidate()
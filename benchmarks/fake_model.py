@@ -0,0 +1,242 @@
+"""
+Scripted stand-ins for the LLMs behind the front desk agent and the
+booking abuse detector.
+
+The front desk model follows a fixed script based on the latest user message:
+
+- "... available ..." / "... free ..."      -> calls check_available_schedule
+- "Book 2026-10-20 10:00 for 60 minutes. Name: Ann Lee. Phone: 555-0101"
+                                            -> calls book_an_appointment
+- after a tool call                         -> replies with the tool output
+- anything else                             -> a canned greeting
+
+The detector model flags a message as high-threat abuse once the session
+summary reports at least ABUSE_THRESHOLD messages with abuse indicators.
+
+Both models sleep for a configurable latency and report token usage
+estimated from the prompt size, so framework overhead can be measured on
+its own or with realistic model delays.
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from abc import abstractmethod
+from datetime import datetime, timedelta
+from itertools import count
+
+from agents import ModelResponse, Usage
+from agents.models.interface import Model
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseUsage,
+)
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+
+from guardrails.input.pre_classifier import RISKY_PATTERNS, latest_user_text
+
+# --------- Configuration ----------
+CHARS_PER_TOKEN = 4
+ABUSE_THRESHOLD = 3
+
+AVAILABILITY_PATTERN = re.compile(r"\b(available|availability|free|open)\b", re.IGNORECASE)
+BOOKING_PATTERN = re.compile(
+    r"\bbook\b.*?(\d{4}-\d{2}-\d{2})[ T](\d{1,2}:\d{2})"
+    r"(?:.*?(\d+)\s*min)?"
+    r"(?:.*?name:\s*([^.\n]+))?"
+    r"(?:.*?phone:\s*([\d+\- ]+))?",
+    re.IGNORECASE | re.DOTALL,
+)
+SUSPICIOUS_COUNT_PATTERN = re.compile(r"(\d+) recent messages with abuse indicators")
+
+_ids = count(1)
+
+
+def _estimate_tokens(value) -> int:
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _message(text: str) -> ResponseOutputMessage:
+    return ResponseOutputMessage(
+        id=f"msg_{next(_ids)}",
+        type="message",
+        role="assistant",
+        status="completed",
+        content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+    )
+
+
+def _tool_call(name: str, arguments: dict) -> ResponseFunctionToolCall:
+    call_id = f"call_{next(_ids)}"
+    return ResponseFunctionToolCall(
+        id=call_id,
+        call_id=call_id,
+        type="function_call",
+        name=name,
+        arguments=json.dumps(arguments),
+    )
+
+
+class ScriptedModel(Model):
+    """Base class: latency, usage accounting and response assembly."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        """
+        Args:
+            latency: Seconds slept per model call
+            jitter: Extra uniformly random seconds (0..jitter) per call
+            seed: Seed for the jitter
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    @abstractmethod
+    def reply(self, system_instructions, input, tools, output_schema) -> list:
+        """Return the output items for one model call."""
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        *,
+        previous_response_id=None,
+        conversation_id=None,
+        prompt=None,
+    ) -> ModelResponse:
+        self.calls += 1
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        output = self.reply(system_instructions, input, tools, output_schema)
+        input_tokens = _estimate_tokens(system_instructions or "") + _estimate_tokens(input)
+        output_tokens = sum(_estimate_tokens(item.model_dump()) for item in output)
+        return ModelResponse(
+            output=output,
+            usage=Usage(
+                requests=1,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                total_tokens=input_tokens + output_tokens,
+            ),
+            response_id=None,
+        )
+
+    async def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        *,
+        previous_response_id=None,
+        conversation_id=None,
+        prompt=None,
+    ):
+        """Stream the scripted reply as a single response.completed event."""
+        response = await self.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing
+        )
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            sequence_number=0,
+            response=Response(
+                id=f"scripted-{self.calls}",
+                created_at=time.time(),
+                model="scripted",
+                object="response",
+                output=response.output,
+                parallel_tool_calls=False,
+                tool_choice="auto",
+                tools=[],
+                usage=ResponseUsage(
+                    input_tokens=response.usage.input_tokens,
+                    input_tokens_details=InputTokensDetails(cached_tokens=0),
+                    output_tokens=response.usage.output_tokens,
+                    output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+                    total_tokens=response.usage.total_tokens,
+                ),
+            ),
+        )
+
+
+class ScriptedFrontDeskModel(ScriptedModel):
+    """Drives the front desk agent's tools from the latest user message."""
+
+    def reply(self, system_instructions, input, tools, output_schema) -> list:
+        tool_names = {tool.name for tool in tools}
+
+        # Second model call of a tool turn: answer with what the tool returned
+        if isinstance(input, list) and input and isinstance(input[-1], dict) \
+                and input[-1].get("type") == "function_call_output":
+            return [_message(str(input[-1].get("output", "")))]
+
+        text = latest_user_text(input)
+
+        booking = BOOKING_PATTERN.search(text)
+        if booking and "book_an_appointment" in tool_names:
+            date, clock, minutes, name, phone = booking.groups()
+            start = datetime.strptime(f"{date} {clock}", "%Y-%m-%d %H:%M")
+            end = start + timedelta(minutes=int(minutes or 60))
+            return [_tool_call("book_an_appointment", {
+                "name": (name or "Guest").strip(),
+                "contact_num": (phone or "").strip(),
+                "start_time": start.isoformat(),
+                "end_time": end.isoformat(),
+            })]
+
+        if AVAILABILITY_PATTERN.search(text) and "check_available_schedule" in tool_names:
+            return [_tool_call("check_available_schedule", {})]
+
+        return [_message("Hello! I can check our availability or book an appointment for you.")]
+
+
+class ScriptedDetectorModel(ScriptedModel):
+    """Returns BookingAbuseAnalysis JSON for the booking abuse detector."""
+
+    def reply(self, system_instructions, input, tools, output_schema) -> list:
+        text = latest_user_text(input)
+        suspicious = 0
+        if isinstance(input, list):
+            for item in input:
+                match = SUSPICIOUS_COUNT_PATTERN.search(str(item.get("content", ""))) if isinstance(item, dict) else None
+                if match:
+                    suspicious = int(match.group(1))
+
+        risky = any(pattern.search(text) for pattern in RISKY_PATTERNS)
+        is_abuse = risky and suspicious >= ABUSE_THRESHOLD
+        analysis = {
+            "is_abuse_attempt": is_abuse,
+            "reasoning": "Scripted verdict",
+            "threat_level": "high" if is_abuse else ("medium" if risky else "none"),
+            "abuse_type": "slot_hoarding" if is_abuse else None,
+        }
+        return [_message(json.dumps(analysis))]
+
+
+def install_fake_models(front_desk_model: Model, detector_model: Model) -> None:
+    """Point the front desk agent and the abuse detector at stand-in models."""
+    from agents import set_tracing_disabled
+    from guardrails.input.booking_abuse import booking_abuse_detector
+    from saas_agents.front_desk_agent import front_desk_agent
+
+    set_tracing_disabled(True)  # Traces would be exported over the network
+    front_desk_agent.model = front_desk_model
+    booking_abuse_detector.model = detector_model
@@ -0,0 +1,231 @@
+"""
+Concurrent load test for the front desk agent.
+
+Drives many simultaneous scripted conversations through Runner.run against
+the stand-in calendar and models, with configurable injected latencies.
+Conversations are a mix of:
+
+- availability: greets, then asks what is available
+- booking:      asks what is available, then books one of a few popular
+                slots (so concurrent customers compete for the same times)
+- abuse:        keeps asking to book every slot until the guardrail blocks it
+
+Reports p50/p95/p99 turn latency, throughput, double bookings found in the
+calendar afterwards, and the guardrail block rate. The JSON report also
+carries the metrics registry snapshot (per-stage latencies, token usage).
+
+Usage:
+    uv run -m benchmarks.load_test
+    uv run -m benchmarks.load_test --conversations 500 --concurrency 100 --model-latency 0.8
+    GUARDRAIL_MODE=parallel uv run -m benchmarks.load_test --output load.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from agents import RunConfig, Runner, SQLiteSession
+from agents.exceptions import InputGuardrailTripwireTriggered
+
+from benchmarks.fake_calendar import FakeCalendarService, install_fake_calendar, synthetic_events
+from benchmarks.fake_model import ScriptedDetectorModel, ScriptedFrontDeskModel, install_fake_models
+from core.context import SharedContext
+from core.metrics import metrics
+from guardrails.input.guardrail_gate import GUARDRAIL_MODE
+from saas_agents.front_desk_agent import front_desk_agent
+from services.busy_index import BusyIndex
+from services.calendar_events import parse_event_times
+from services.google_calendar import BUSINESS_HOURS_END, BUSINESS_HOURS_START
+
+# --------- Configuration ----------
+DEFAULT_CONVERSATIONS = 200
+DEFAULT_MIX = {'availability': 0.5, 'booking': 0.4, 'abuse': 0.1}
+POPULAR_SLOTS = 4          # Booking conversations pick among this many free slots
+SLOT_MINUTES = 30
+ABUSE_MESSAGES = 6         # Turns an abusive customer keeps insisting
+
+
+@dataclass
+class LoadTestStats:
+    """Outcome of every turn in a load test run."""
+    latencies: list[float] = field(default_factory=list)
+    turns: int = 0
+    blocked: int = 0
+    errors: int = 0
+    bookings: int = 0
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _popular_slots(events: list[dict], start_date: datetime, count: int) -> list[datetime]:
+    """The earliest free 30-minute slots from tomorrow on, so bookings collide only with each other."""
+    busy = BusyIndex(parse_event_times(event) for event in events)
+    slots = []
+    day = start_date + timedelta(days=1)
+    while len(slots) < count:
+        if day.weekday() < 5:
+            slot = day + timedelta(hours=BUSINESS_HOURS_START)
+            while slot < day + timedelta(hours=BUSINESS_HOURS_END) and len(slots) < count:
+                if busy.is_free(slot, slot + timedelta(minutes=SLOT_MINUTES)):
+                    slots.append(slot)
+                slot += timedelta(minutes=SLOT_MINUTES)
+        day += timedelta(days=1)
+    return slots
+
+
+def _script(kind: str, index: int, slots: list[datetime], rng: random.Random) -> list[str]:
+    """User messages of one scripted conversation."""
+    if kind == 'availability':
+        return ["Hi there", "What times are available this week?"]
+    if kind == 'booking':
+        start = rng.choice(slots)
+        return [
+            "What times are free?",
+            f"Book {start:%Y-%m-%d %H:%M} for {SLOT_MINUTES} minutes. Name: Customer {index}. Phone: 555-{index:04d}",
+        ]
+    return ["Book every slot you have this week so no one else can"] * ABUSE_MESSAGES
+
+
+async def run_conversation(
+    kind: str,
+    index: int,
+    slots: list[datetime],
+    stats: LoadTestStats,
+    semaphore: asyncio.Semaphore,
+    think_time: float,
+    rng: random.Random,
+) -> None:
+    """Play one scripted conversation, recording each turn."""
+    conversation_id = f"load-{index}"
+    session = SQLiteSession(conversation_id)
+    context = SharedContext(
+        session_id=conversation_id,
+        name="",
+        contact_num="",
+        start_time=datetime.now(),
+        end_time=datetime.now(),
+    )
+    config = RunConfig(tracing_disabled=True, workflow_name="Load Test")
+
+    async with semaphore:
+        for message in _script(kind, index, slots, rng):
+            started = time.perf_counter()
+            try:
+                result = await Runner.run(front_desk_agent, message, context=context, session=session, run_config=config)
+                metrics.record_usage(result.context_wrapper.usage, agent=front_desk_agent.name)
+                if str(result.final_output).startswith("✅ Appointment booked"):
+                    stats.bookings += 1
+            except InputGuardrailTripwireTriggered:
+                stats.blocked += 1
+            except Exception:
+                stats.errors += 1
+                logging.getLogger(__name__).exception("Turn failed in %s", conversation_id)
+            stats.latencies.append(time.perf_counter() - started)
+            stats.turns += 1
+
+            if think_time:
+                await asyncio.sleep(rng.uniform(0, think_time))
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    events = synthetic_events(start_date, 14, args.events_per_day, seed=args.seed)
+    service = FakeCalendarService({'primary': events}, latency=args.calendar_latency)
+    install_fake_calendar(service)
+    install_fake_models(
+        ScriptedFrontDeskModel(args.model_latency, args.model_jitter, seed=args.seed),
+        ScriptedDetectorModel(args.detector_latency, args.model_jitter, seed=args.seed + 1),
+    )
+
+    # A few popular slots, so concurrent bookings compete for the same times
+    slots = _popular_slots(events, start_date, POPULAR_SLOTS)
+
+    kinds = list(DEFAULT_MIX)
+    weights = [args.availability, args.booking, args.abuse]
+    stats = LoadTestStats()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # Tools print progress lines
+        await asyncio.gather(*(
+            run_conversation(rng.choices(kinds, weights)[0], index, slots, stats, semaphore, args.think_time, rng)
+            for index in range(args.conversations)
+        ))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(stats.latencies)
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'parameters': {**vars(args), 'guardrail_mode': GUARDRAIL_MODE},
+        'turns': stats.turns,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_turns_per_s': round(stats.turns / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'p50': round(_percentile(ordered, 0.50) * 1000, 2),
+            'p95': round(_percentile(ordered, 0.95) * 1000, 2),
+            'p99': round(_percentile(ordered, 0.99) * 1000, 2),
+            'max': round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        },
+        'bookings': stats.bookings,
+        'double_bookings': service.double_bookings('primary'),
+        'guardrail_blocks': stats.blocked,
+        'guardrail_block_rate': round(stats.blocked / stats.turns, 4) if stats.turns else 0.0,
+        'errors': stats.errors,
+        'calendar_calls': dict(service.calls),
+        'metrics': metrics.snapshot(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the front desk agent with scripted conversations')
+    parser.add_argument('--conversations', type=int, default=DEFAULT_CONVERSATIONS)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONVERSATIONS,
+                        help='Conversations in flight at once (default: all)')
+    parser.add_argument('--availability', type=float, default=DEFAULT_MIX['availability'],
+                        help='Share of availability-only conversations')
+    parser.add_argument('--booking', type=float, default=DEFAULT_MIX['booking'],
+                        help='Share of booking conversations')
+    parser.add_argument('--abuse', type=float, default=DEFAULT_MIX['abuse'],
+                        help='Share of abusive conversations')
+    parser.add_argument('--model-latency', type=float, default=0.0, help='Seconds per front desk model call')
+    parser.add_argument('--detector-latency', type=float, default=0.0, help='Seconds per detector model call')
+    parser.add_argument('--model-jitter', type=float, default=0.0, help='Extra random seconds per model call')
+    parser.add_argument('--calendar-latency', type=float, default=0.0, help='Seconds per Calendar API request')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Max random pause between turns')
+    parser.add_argument('--events-per-day', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the report to this JSON file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)  # The guardrail logs every abusive message
+    report = asyncio.run(run(args))
+
+    latency = report['latency_ms']
+    print(f"🧪 {report['turns']} turns in {report['elapsed_s']}s "
+          f"({report['throughput_turns_per_s']} turns/s, guardrail mode: {GUARDRAIL_MODE})")
+    print(f"⏱️  Turn latency p50 {latency['p50']} ms | p95 {latency['p95']} ms | p99 {latency['p99']} ms")
+    print(f"📌 Bookings: {report['bookings']} | double bookings: {report['double_bookings']}")
+    print(f"🛡️  Guardrail blocks: {report['guardrail_blocks']} ({report['guardrail_block_rate']:.1%} of turns)")
+    if report['errors']:
+        print(f"❌ Errors: {report['errors']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Offline benchmark suite for the front desk agent.
+
+Times the calendar hot path, the booking abuse guardrail and whole
+Runner.run turns against the stand-in calendar and models. Pass --output to
+write the results to JSON, and --compare with an earlier results file to see
+the change in median time per benchmark.
+
+Usage:
+    uv run -m benchmarks.run_benchmarks
+    uv run -m benchmarks.run_benchmarks --output before.json
+    uv run -m benchmarks.run_benchmarks --compare before.json --output after.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import platform
+import statistics
+import time
+from datetime import datetime, timedelta
+from itertools import count
+from types import SimpleNamespace
+
+from agents import RunConfig, Runner
+
+from benchmarks.fake_calendar import FakeCalendarService, install_fake_calendar, synthetic_events
+from benchmarks.fake_model import ScriptedDetectorModel, ScriptedFrontDeskModel, install_fake_models
+from core.context import SharedContext
+from guardrails.input.booking_abuse import booking_abuse_guardrail, booking_verdict_cache
+from saas_agents.front_desk_agent import front_desk_agent
+from services.google_calendar import (
+    _calculate_available_slots,
+    _format_availability,
+    _get_busy_times,
+    find_available_slots,
+    get_available_schedule,
+)
+
+# --------- Configuration ----------
+DEFAULT_REPEAT = 50
+DEFAULT_DAYS = 90
+DEFAULT_EVENTS_PER_DAY = 20
+
+_sessions = count(1)
+
+
+# --------- Timing ----------
+
+def _summarize(samples: list[float]) -> dict:
+    """Summarize timings (seconds) in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        'runs': len(ordered),
+        'min_ms': round(ordered[0] * 1000, 4),
+        'median_ms': round(statistics.median(ordered) * 1000, 4),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 4),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+    }
+
+
+def time_sync(func, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return _summarize(samples)
+
+
+async def time_async(make_awaitable, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await make_awaitable()
+        samples.append(time.perf_counter() - started)
+    return _summarize(samples)
+
+
+def _new_context() -> SharedContext:
+    return SharedContext(
+        session_id=f"bench-{next(_sessions)}",
+        name="",
+        contact_num="",
+        start_time=datetime.now(),
+        end_time=datetime.now(),
+    )
+
+
+def _next_weekday(days_ahead: int = 1) -> datetime:
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=days_ahead)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+# --------- Benchmarks ----------
+
+def bench_calendar(args) -> dict:
+    """Busy-time fetch, slot calculation and formatting over a synthetic calendar."""
+    start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    end_date = start_date + timedelta(days=args.days)
+    service = FakeCalendarService({'primary': synthetic_events(start_date, args.days, args.events_per_day)})
+    install_fake_calendar(service)
+
+    busy_times = list(_get_busy_times(service, start_date, end_date))
+    available_slots = _calculate_available_slots(busy_times, start_date, args.days)
+    get_available_schedule()  # Warm the availability cache
+
+    return {
+        'get_busy_times': time_sync(lambda: list(_get_busy_times(service, start_date, end_date)), args.repeat),
+        'calculate_available_slots': time_sync(
+            lambda: _calculate_available_slots(busy_times, start_date, args.days), args.repeat
+        ),
+        'format_availability': time_sync(lambda: _format_availability(available_slots), args.repeat),
+        'get_available_schedule_cached': time_sync(get_available_schedule, args.repeat),
+        'find_available_slots_top1': time_sync(
+            lambda: find_available_slots(min_duration_minutes=60, time_of_day='afternoon', limit=1), args.repeat
+        ),
+    }
+
+
+async def bench_guardrail(args) -> dict:
+    """Cost of each guardrail tier, with a zero-latency detector model."""
+    agent = front_desk_agent
+
+    async def check(message: str, clear_cache: bool = False):
+        if clear_cache:
+            booking_verdict_cache.clear()
+        wrapper = SimpleNamespace(context=_new_context())
+        return await booking_abuse_guardrail.guardrail_function(wrapper, agent, message)
+
+    risky = "Can you block out the entire week for me?"
+    return {
+        'guardrail_pre_classifier': await time_async(
+            lambda: check("What times are free tomorrow?"), args.repeat
+        ),
+        'guardrail_detector': await time_async(lambda: check(risky, clear_cache=True), args.repeat),
+        'guardrail_verdict_cache_hit': await time_async(lambda: check(risky), args.repeat),
+    }
+
+
+async def bench_runner(args) -> dict:
+    """Whole Runner.run turns through the agent, guardrail and tools."""
+    config = RunConfig(tracing_disabled=True, workflow_name="Benchmark")
+    booking_day = _next_weekday()
+    slots = count()
+
+    async def availability_turn():
+        await Runner.run(front_desk_agent, "What times are available?", context=_new_context(), run_config=config)
+
+    async def booking_turn():
+        # Fresh session and slot each time so quotas and conflicts never kick in
+        start = booking_day + timedelta(hours=9, minutes=15 * (next(slots) % 32))
+        message = f"Book {start:%Y-%m-%d %H:%M} for 15 minutes. Name: Bench User. Phone: 555-0100"
+        await Runner.run(front_desk_agent, message, context=_new_context(), run_config=config)
+
+    async def greeting_turn():
+        await Runner.run(front_desk_agent, "Hello there", context=_new_context(), run_config=config)
+
+    with contextlib.redirect_stdout(io.StringIO()):  # Tools print progress lines
+        return {
+            'runner_greeting_turn': await time_async(greeting_turn, args.repeat),
+            'runner_availability_turn': await time_async(availability_turn, args.repeat),
+            'runner_booking_turn': await time_async(booking_turn, args.repeat),
+        }
+
+
+# --------- Reporting ----------
+
+def compare(results: dict, baseline: dict) -> None:
+    print(f"\n{'benchmark':<32}{'baseline ms':>14}{'current ms':>14}{'change':>10}")
+    for name, stats in results['benchmarks'].items():
+        before = baseline.get('benchmarks', {}).get(name)
+        if before is None:
+            print(f"{name:<32}{'-':>14}{stats['median_ms']:>14.3f}{'new':>10}")
+            continue
+        change = (stats['median_ms'] - before['median_ms']) / before['median_ms'] * 100 if before['median_ms'] else 0.0
+        print(f"{name:<32}{before['median_ms']:>14.3f}{stats['median_ms']:>14.3f}{change:>+9.1f}%")
+
+
+async def run(args) -> dict:
+    install_fake_models(ScriptedFrontDeskModel(), ScriptedDetectorModel())
+
+    benchmarks = {}
+    print("📅 Calendar hot path...")
+    benchmarks.update(bench_calendar(args))
+    print("🛡️  Guardrail tiers...")
+    benchmarks.update(await bench_guardrail(args))
+    print("🤖 Runner turns...")
+    benchmarks.update(await bench_runner(args))
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'parameters': {'repeat': args.repeat, 'days': args.days, 'events_per_day': args.events_per_day},
+        'benchmarks': benchmarks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the offline benchmark suite')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Earlier results JSON to compare against')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Runs per benchmark')
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help='Days in the synthetic calendar')
+    parser.add_argument('--events-per-day', type=int, default=DEFAULT_EVENTS_PER_DAY)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)  # The guardrail logs every risky benchmark message
+    results = asyncio.run(run(args))
+
+    for name, stats in results['benchmarks'].items():
+        print(f"   {name:<32} median {stats['median_ms']:>10.3f} ms   p95 {stats['p95_ms']:>10.3f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
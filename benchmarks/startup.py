@@ -0,0 +1,132 @@
+"""
+Cold start benchmark for worker processes.
+
+Every sample runs in a fresh interpreter, so module caches never hide the
+cost a newly spawned worker pays. Each child reports:
+
+- import_agent:           import saas_agents.front_desk_agent
+- import_server:          import core.server on top of the agent
+- build_model:            first use of the lazily built LiteLLM model
+- build_calendar_service: build the Calendar service from the bundled
+                          discovery document (no credentials, no network)
+- first_turn:             first Runner.run turn, with the stand-in models
+                          and calendar
+
+The parent also records the wall time of the whole child process.
+
+Usage:
+    uv run -m benchmarks.startup
+    uv run -m benchmarks.startup --repeat 10 --output startup.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# --------- Configuration ----------
+DEFAULT_REPEAT = 5
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def measure() -> dict:
+    """Time the startup stages in this (fresh) process."""
+    timings = {}
+
+    started = time.perf_counter()
+    from saas_agents.front_desk_agent import front_desk_agent
+    timings['import_agent'] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    import core.server  # noqa: F401
+    timings['import_server'] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    front_desk_agent.model.load()
+    timings['build_model'] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    from googleapiclient.discovery import build
+    build('calendar', 'v3', developerKey='offline-benchmark', static_discovery=True, cache_discovery=False)
+    timings['build_calendar_service'] = _elapsed_ms(started)
+
+    import asyncio
+    import contextlib
+    import io
+    from agents import RunConfig, Runner
+    from benchmarks.fake_calendar import FakeCalendarService, install_fake_calendar, synthetic_events
+    from benchmarks.fake_model import ScriptedDetectorModel, ScriptedFrontDeskModel, install_fake_models
+    from core.context import SharedContext
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    install_fake_calendar(FakeCalendarService({'primary': synthetic_events(today, 14, 10)}))
+    install_fake_models(ScriptedFrontDeskModel(), ScriptedDetectorModel())
+    context = SharedContext(name="", contact_num="", start_time=datetime.now(), end_time=datetime.now())
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # Tools print progress lines
+        asyncio.run(Runner.run(
+            front_desk_agent,
+            "What times are available?",
+            context=context,
+            run_config=RunConfig(tracing_disabled=True),
+        ))
+    timings['first_turn'] = _elapsed_ms(started)
+
+    return timings
+
+
+def run(repeat: int) -> dict:
+    samples: dict[str, list[float]] = {}
+    for i in range(repeat):
+        print(f"🚀 Cold start {i + 1}/{repeat}...")
+        started = time.perf_counter()
+        child = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.startup', '--child'],
+            capture_output=True, text=True, check=True,
+        )
+        samples.setdefault('process_total', []).append(_elapsed_ms(started))
+        for name, value in json.loads(child.stdout.strip().splitlines()[-1]).items():
+            samples.setdefault(name, []).append(value)
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'parameters': {'repeat': repeat},
+        'startup_ms': {
+            name: {'median': round(statistics.median(values), 2), 'max': max(values)}
+            for name, values in samples.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure worker cold start: imports and first request')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Fresh processes to sample')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure()))
+        return
+
+    results = run(args.repeat)
+    for name, stats in results['startup_ms'].items():
+        print(f"   {name:<24} median {stats['median']:>10.2f} ms   max {stats['max']:>10.2f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
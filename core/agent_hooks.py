@@ -0,0 +1,28 @@
+"""
+Agent lifecycle hooks shared by the front desk agent and the guardrail agents.
+"""
+
+import time
+
+from agents import AgentHooks, RunContextWrapper
+
+from core.metrics import MetricsRegistry, metrics
+
+
+class ModelTimingHooks(AgentHooks):
+    """Times every LLM call of the agent the hooks are attached to (llm_call_seconds)."""
+
+    def __init__(self, registry: MetricsRegistry = metrics):
+        self.registry = registry
+        self._started: dict[int, float] = {}  # id(context) -> start of the pending LLM call
+
+    async def on_llm_start(self, context: RunContextWrapper, agent, system_prompt, input_items) -> None:
+        self._started[id(context)] = time.perf_counter()
+
+    async def on_llm_end(self, context: RunContextWrapper, agent, response) -> None:
+        started = self._started.pop(id(context), None)
+        if started is not None:
+            self.registry.observe("llm_call_seconds", time.perf_counter() - started, agent=agent.name)
+
+
+model_timing_hooks = ModelTimingHooks()
@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from datetime import datetime
 
 class SharedContext(BaseModel):
+    session_id: str = ""  # Conversation this context belongs to
     name: str
     contact_num: str
     start_time: datetime
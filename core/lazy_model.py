@@ -0,0 +1,42 @@
+"""
+Model placeholder that builds the real model on first use.
+
+Constructing a LitellmModel imports LiteLLM, which takes longer than the
+rest of the agent imports combined. Wrapping the construction in a
+LazyModel keeps `import saas_agents.front_desk_agent` cheap, so workers
+start quickly and only pay for the provider SDK when the first turn runs.
+"""
+
+import threading
+from typing import Callable
+
+from agents.models.interface import Model
+
+
+class LazyModel(Model):
+    """Agents SDK Model that delegates to a model created by `factory` on first call."""
+
+    def __init__(self, factory: Callable[[], Model], model: str):
+        """
+        Args:
+            factory: Builds the real model (imports belong inside it)
+            model: Name of the model the factory builds, for settings and logs
+        """
+        self.factory = factory
+        self.model = model
+        self._lock = threading.Lock()
+        self._model: Model | None = None
+
+    def load(self) -> Model:
+        """Return the real model, building it if needed."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self.factory()
+        return self._model
+
+    async def get_response(self, *args, **kwargs):
+        return await self.load().get_response(*args, **kwargs)
+
+    def stream_response(self, *args, **kwargs):
+        return self.load().stream_response(*args, **kwargs)
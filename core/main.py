@@ -23,6 +23,7 @@ from datetime import datetime
 
 #Session
 from agents import SQLiteSession
+from core.session_compaction import CompactingSession
 
 #Guardrails
 from agents.exceptions import InputGuardrailTripwireTriggered
@@ -30,24 +31,39 @@ from agents.exceptions import InputGuardrailTripwireTriggered
 #Trace
 from agents import trace
 
+#Calendar
+from services.google_calendar import run_calendar_sync
+
+#Metrics
+import os
+from core.metrics import JsonlExporter, metrics
+
 async def main():
+    # Optional: append a metrics snapshot to this file when the session ends
+    if os.environ.get("METRICS_JSONL_PATH"):
+        metrics.add_exporter(JsonlExporter(os.environ["METRICS_JSONL_PATH"]))
+
+    # Keep the local calendar mirror current in the background
+    calendar_sync = asyncio.create_task(run_calendar_sync())
+
     #Create initial context
+    # Use a unique ID per user/conversation in production
     context = SharedContext(
+        session_id="front_desk_session",
         name = "",
         contact_num="",
         start_time=datetime.now(),
         end_time=datetime.now()
     )
 
+    # Older turns are folded into a summary once the history passes its token budget
+    session = CompactingSession(SQLiteSession(context.session_id), context)
+
 
     #Using Run Demo Loop
     #await run_demo_loop(front_desk_agent, context=context)
 
     # Using Runner - More controlled
-    # Use a unique ID per user/conversation in production
-    session = SQLiteSession("front_desk_session")
-    
-    
     config = RunConfig(
         trace_include_sensitive_data=True,  #Content invisibility
         #tracing_disabled=True, #Completely zero visibility
@@ -60,20 +76,24 @@ async def main():
         metadata={"session_type": "front_desk"}  # Optional metadata
     ):
         while True:
-            user_input = input("Ask anything: ").strip()
+            user_input = (await asyncio.to_thread(input, "Ask anything: ")).strip()  # Keeps background sync running
 
             if user_input.lower() in ('quit', 'exit', 'q'):
+                calendar_sync.cancel()
+                metrics.export()
                 print("Goodbye!")
                 break
 
             try:
-                result = await Runner.run(
-                    front_desk_agent,
-                    user_input,
-                    context=context,
-                    session=session,
-                    run_config=config
-                )
+                with metrics.timer("agent_turn_seconds"):
+                    result = await Runner.run(
+                        front_desk_agent,
+                        user_input,
+                        context=context,
+                        session=session,
+                        run_config=config
+                    )
+                metrics.record_usage(result.context_wrapper.usage, agent=front_desk_agent.name)
                 print(result)
             except InputGuardrailTripwireTriggered as e:
                 # Catch for Guardrail blocking the input
@@ -0,0 +1,246 @@
+"""
+In-process metrics for the hot path of a turn.
+
+Records latency histograms, counters and token usage, and hands snapshots
+to pluggable exporters. Nothing leaves the process unless an exporter
+writes it somewhere; both exporters here work offline:
+
+- PrometheusTextExporter: renders the Prometheus text format (served by
+  core.server at GET /metrics, or written to a file)
+- JsonlExporter: appends one JSON snapshot per export to a file
+
+Usage:
+    from core.metrics import metrics
+
+    with metrics.timer("calendar_api_seconds", method="events.list"):
+        ...
+    metrics.inc("guardrail_decisions_total", tier="detector", outcome="blocked")
+
+    metrics.add_exporter(JsonlExporter("metrics.jsonl"))
+    await metrics.export_periodically(60)
+"""
+
+import asyncio
+import bisect
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Protocol
+
+import logging
+logger = logging.getLogger(__name__)
+
+# --------- Configuration ----------
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+EXPORT_INTERVAL_SECONDS = 60
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as Prometheus expects."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """(upper bound, observations <= bound) pairs, ending with +Inf."""
+        total, result = 0, []
+        for bound, bucket_count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += bucket_count
+            result.append((bound, total))
+        return result
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._exporters: list['MetricsExporter'] = []
+
+    # --------- Recording ----------
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        """Add to a counter."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record a value (seconds, for latencies) in a histogram."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe the duration of a block, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name: str, **labels):
+        """Decorator form of timer() for sync or async functions."""
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(name, **labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record_usage(self, usage, agent: str) -> None:
+        """Count the tokens and model requests of a run (RunResult.context_wrapper.usage)."""
+        self.inc("llm_requests_total", usage.requests, agent=agent)
+        self.inc("llm_input_tokens_total", usage.input_tokens, agent=agent)
+        self.inc("llm_output_tokens_total", usage.output_tokens, agent=agent)
+        cached = getattr(usage.input_tokens_details, "cached_tokens", 0) or 0
+        self.inc("llm_cached_input_tokens_total", cached, agent=agent)
+
+    # --------- Reading ----------
+
+    def snapshot(self) -> dict:
+        """Point-in-time copy of every series, safe to serialize."""
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self._counters.items()
+                },
+                "histograms": {
+                    name: [
+                        {
+                            "labels": dict(key),
+                            "count": histogram.count,
+                            "sum": histogram.sum,
+                            "buckets": histogram.cumulative(),
+                        }
+                        for key, histogram in series.items()
+                    ]
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    # --------- Export ----------
+
+    def add_exporter(self, exporter: 'MetricsExporter') -> None:
+        self._exporters.append(exporter)
+
+    def export(self) -> None:
+        """Hand the current snapshot to every exporter."""
+        snapshot = self.snapshot()
+        for exporter in self._exporters:
+            try:
+                exporter.export(snapshot)
+            except Exception:
+                logger.exception("Metrics export failed for %s", type(exporter).__name__)
+
+    async def export_periodically(self, interval: float = EXPORT_INTERVAL_SECONDS) -> None:
+        """Export every `interval` seconds until cancelled, then once more."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await asyncio.to_thread(self.export)
+        finally:
+            self.export()
+
+
+# --------- Exporters ----------
+
+class MetricsExporter(Protocol):
+    def export(self, snapshot: dict) -> None: ...
+
+
+def _format_labels(labels: dict, **extra) -> str:
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class PrometheusTextExporter:
+    """Renders snapshots in the Prometheus text exposition format."""
+
+    def __init__(self, path: str | None = None):
+        """
+        Args:
+            path: File to (over)write on every export, e.g. for the node
+                exporter's textfile collector. Leave unset to only render().
+        """
+        self.path = path
+
+    @staticmethod
+    def render(snapshot: dict) -> str:
+        lines = []
+        for name, series in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE {name} counter")
+            for sample in series:
+                lines.append(f"{name}{_format_labels(sample['labels'])} {sample['value']}")
+        for name, series in sorted(snapshot["histograms"].items()):
+            lines.append(f"# TYPE {name} histogram")
+            for sample in series:
+                for bound, count in sample["buckets"]:
+                    lines.append(f"{name}_bucket{_format_labels(sample['labels'], le=bound)} {count}")
+                lines.append(f"{name}_sum{_format_labels(sample['labels'])} {sample['sum']}")
+                lines.append(f"{name}_count{_format_labels(sample['labels'])} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, snapshot: dict) -> None:
+        if self.path is not None:
+            with open(self.path, "w") as f:
+                f.write(self.render(snapshot))
+
+
+class JsonlExporter:
+    """Appends one JSON snapshot per export to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, snapshot: dict) -> None:
+        with open(self.path, "a") as f:
+            f.write(json.dumps(snapshot) + "\n")
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,282 @@
+"""
+Serves many customer conversations concurrently over HTTP and WebSocket.
+
+Each conversation has its own session ID, session history and SharedContext.
+Agent runs are limited by a configurable concurrency cap; when too many
+requests are already waiting, new ones are rejected with 503 so clients can
+back off instead of piling up.
+
+Usage:
+    uv run -m core.server
+    uv run -m core.server --port 8080 --max-concurrent-runs 32
+
+Endpoints:
+    POST /conversations/{conversation_id}/messages   {"message": "..."}
+    GET  /conversations/{conversation_id}/ws         (WebSocket, one text message per turn)
+    GET  /health
+    GET  /metrics                                    (Prometheus text format)
+
+While the server runs, the local calendar mirror is synced in the background
+so availability checks never wait on the Calendar API.
+
+Set METRICS_JSONL_PATH to also append a metrics snapshot to that file every
+METRICS_EXPORT_INTERVAL seconds.
+"""
+#Load Environments
+from dotenv import load_dotenv
+load_dotenv()
+
+#Import Agent
+from saas_agents.front_desk_agent import front_desk_agent
+
+#Runner
+import argparse
+import asyncio
+import contextlib
+from agents import Runner, RunConfig
+
+#Context
+from core.context import SharedContext
+from datetime import datetime
+
+#Metrics
+import os
+from core.metrics import JsonlExporter, PrometheusTextExporter, metrics
+
+#Calendar
+from services.google_calendar import run_calendar_sync
+
+#Session
+from collections import OrderedDict
+from core.session_store import SessionStore
+from core.session_compaction import CompactingSession
+
+#Guardrails
+from agents.exceptions import InputGuardrailTripwireTriggered
+
+#Server
+from aiohttp import WSMsgType, web
+
+import logging
+logger = logging.getLogger(__name__)
+
+# --------- Configuration ----------
+MAX_CONCURRENT_RUNS = 16   # Agent runs in flight at once
+MAX_WAITING_RUNS = 64      # Queued runs before new requests get 503
+MAX_ACTIVE_CONVERSATIONS = 10_000  # Conversation contexts kept in memory
+SESSION_DB_PATH = 'conversations.db'
+METRICS_EXPORT_INTERVAL = 60  # Seconds between exports when METRICS_JSONL_PATH is set
+
+
+class ServerBusy(Exception):
+    """Raised when the run queue is full and the request should be retried later."""
+
+
+class Conversation:
+    """Per-conversation state: session history, booking context and a turn lock."""
+
+    def __init__(self, conversation_id: str, store: SessionStore):
+        self.conversation_id = conversation_id
+        self.context = SharedContext(
+            session_id=conversation_id,
+            name="",
+            contact_num="",
+            start_time=datetime.now(),
+            end_time=datetime.now()
+        )
+        # History replayed to the model stays within a token budget
+        self.session = CompactingSession(store.session(conversation_id), self.context)
+        # Turns of the same conversation must run one after another
+        self.lock = asyncio.Lock()
+
+
+class ConversationManager:
+    """Runs the front desk agent for many conversations with bounded concurrency."""
+
+    def __init__(
+        self,
+        max_concurrent_runs: int = MAX_CONCURRENT_RUNS,
+        max_waiting_runs: int = MAX_WAITING_RUNS,
+        db_path: str = SESSION_DB_PATH,
+        max_active_conversations: int = MAX_ACTIVE_CONVERSATIONS,
+    ):
+        self.store = SessionStore(db_path)
+        self.max_waiting_runs = max_waiting_runs
+        self.max_active_conversations = max_active_conversations
+        self._semaphore = asyncio.Semaphore(max_concurrent_runs)
+        self._waiting = 0
+        # Most recently used last; history survives eviction in the session store
+        self._conversations: OrderedDict[str, Conversation] = OrderedDict()
+
+    def get_conversation(self, conversation_id: str) -> Conversation:
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            conversation = Conversation(conversation_id, self.store)
+            self._conversations[conversation_id] = conversation
+            self._evict_idle_conversations(keep=conversation_id)
+        self._conversations.move_to_end(conversation_id)
+        return conversation
+
+    def _evict_idle_conversations(self, keep: str) -> None:
+        """Forget the least recently used conversations that are not mid-turn."""
+        excess = len(self._conversations) - self.max_active_conversations
+        for conversation_id in list(self._conversations):
+            if excess <= 0:
+                break
+            if conversation_id != keep and not self._conversations[conversation_id].lock.locked():
+                del self._conversations[conversation_id]
+                excess -= 1
+
+    async def handle_message(self, conversation_id: str, user_input: str) -> dict:
+        """
+        Run one turn of a conversation.
+
+        Returns:
+            {"reply": ...} on success, or {"blocked": True, ...} if the
+            guardrail rejected the message
+
+        Raises:
+            ServerBusy: If too many runs are already waiting
+        """
+        if self._waiting >= self.max_waiting_runs:
+            metrics.inc("server_rejections_total")
+            raise ServerBusy()
+
+        conversation = self.get_conversation(conversation_id)
+        config = RunConfig(
+            trace_include_sensitive_data=True,
+            workflow_name="Front Desk Agent Workflow",
+            group_id=conversation_id,  # Link traces by conversation
+            trace_metadata={"session_type": "front_desk"},
+        )
+
+        self._waiting += 1
+        waiting = True
+        try:
+            async with conversation.lock, self._semaphore:
+                self._waiting -= 1
+                waiting = False
+                try:
+                    with metrics.timer("agent_turn_seconds"):
+                        result = await Runner.run(
+                            front_desk_agent,
+                            user_input,
+                            context=conversation.context,
+                            session=conversation.session,
+                            run_config=config
+                        )
+                    metrics.record_usage(result.context_wrapper.usage, agent=front_desk_agent.name)
+                    return {"reply": str(result.final_output)}
+                except InputGuardrailTripwireTriggered as e:
+                    # The blocked message is NOT added to session history
+                    output_info = e.guardrail_result.output.output_info
+                    return {
+                        "blocked": True,
+                        "reason": output_info.reasoning,
+                        "threat_level": output_info.threat_level,
+                        "abuse_type": output_info.abuse_type,
+                    }
+        finally:
+            if waiting:  # Cancelled while queued
+                self._waiting -= 1
+
+    # --------- HTTP ----------
+
+    async def post_message(self, request: web.Request) -> web.Response:
+        conversation_id = request.match_info['conversation_id']
+        try:
+            payload = await request.json()
+            user_input = str(payload['message']).strip()
+        except (ValueError, KeyError, TypeError):
+            return web.json_response({"error": "Expected JSON body {\"message\": \"...\"}"}, status=400)
+
+        try:
+            return web.json_response(await self.handle_message(conversation_id, user_input))
+        except ServerBusy:
+            return web.json_response({"error": "Server busy, retry later"}, status=503, headers={"Retry-After": "1"})
+
+    async def websocket(self, request: web.Request) -> web.WebSocketResponse:
+        conversation_id = request.match_info['conversation_id']
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            try:
+                await ws.send_json(await self.handle_message(conversation_id, msg.data.strip()))
+            except ServerBusy:
+                await ws.send_json({"error": "Server busy, retry later"})
+            except Exception as e:
+                logger.exception("Error handling message for %s", conversation_id)
+                await ws.send_json({"error": str(e)})
+
+        return ws
+
+    async def metrics_endpoint(self, request: web.Request) -> web.Response:
+        return web.Response(text=PrometheusTextExporter.render(metrics.snapshot()), content_type="text/plain")
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "ok",
+            "conversations": len(self._conversations),
+            "waiting_runs": self._waiting,
+        })
+
+
+def create_app(manager: ConversationManager | None = None) -> web.Application:
+    """Create the aiohttp application serving the front desk agent."""
+    manager = manager or ConversationManager()
+
+    async def session_maintenance(app: web.Application):
+        # Expire idle sessions in the background while the server runs
+        task = asyncio.create_task(manager.store.run_maintenance())
+        yield
+        task.cancel()
+        await manager.store.flush()
+        manager.store.close()
+
+    async def calendar_sync(app: web.Application):
+        # Keep the calendar mirror current while the server runs
+        task = asyncio.create_task(run_calendar_sync())
+        yield
+        task.cancel()
+
+    async def metrics_export(app: web.Application):
+        # Optional periodic JSONL snapshots next to the /metrics endpoint
+        path = os.environ.get("METRICS_JSONL_PATH")
+        if not path:
+            yield
+            return
+        metrics.add_exporter(JsonlExporter(path))
+        task = asyncio.create_task(metrics.export_periodically(METRICS_EXPORT_INTERVAL))
+        yield
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task  # Writes a final snapshot
+
+    app = web.Application()
+    app.cleanup_ctx.append(session_maintenance)
+    app.cleanup_ctx.append(calendar_sync)
+    app.cleanup_ctx.append(metrics_export)
+    app.add_routes([
+        web.post('/conversations/{conversation_id}/messages', manager.post_message),
+        web.get('/conversations/{conversation_id}/ws', manager.websocket),
+        web.get('/health', manager.health),
+        web.get('/metrics', manager.metrics_endpoint),
+    ])
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve the front desk agent')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-concurrent-runs', type=int, default=MAX_CONCURRENT_RUNS)
+    parser.add_argument('--max-waiting-runs', type=int, default=MAX_WAITING_RUNS)
+    parser.add_argument('--db-path', default=SESSION_DB_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    manager = ConversationManager(args.max_concurrent_runs, args.max_waiting_runs, args.db_path)
+    web.run_app(create_app(manager), host=args.host, port=args.port)
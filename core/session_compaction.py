@@ -0,0 +1,209 @@
+"""
+Session wrapper that keeps the history replayed to the model bounded.
+
+Every Runner.run sends the whole session history to the model, so a long
+booking negotiation gets slower and more expensive with each turn. Once the
+estimated size of the history passes a token budget, CompactingSession keeps
+the most recent items verbatim and replaces everything older with a single
+summary item. Later compactions fold the previous summary into the new one.
+
+The summary is built locally (no extra model call) and carries the booking
+facts from SharedContext in structured form, plus the customer's earlier
+requests and the bookings already confirmed.
+
+Usage:
+    session = CompactingSession(SQLiteSession("customer-123"), context)
+    await Runner.run(agent, message, context=context, session=session)
+"""
+
+import asyncio
+import json
+import threading
+
+from agents.items import TResponseInputItem
+from agents.memory import SessionABC, SQLiteSession
+
+from core.context import SharedContext
+from core.metrics import metrics
+
+import logging
+logger = logging.getLogger(__name__)
+
+# --------- Configuration ----------
+TOKEN_BUDGET = 4000          # Estimated history tokens that trigger a compaction
+KEEP_RECENT_ITEMS = 8        # Items kept verbatim (extended back to a user message)
+CHARS_PER_TOKEN = 4          # Rough token estimate, no tokenizer needed
+SUMMARY_REQUESTS = 5         # Earlier customer requests kept in the summary
+SUMMARY_REQUEST_CHARS = 200  # Each truncated to this length
+SUMMARY_PREFIX = "Summary of the earlier conversation (older messages omitted): "
+
+
+def estimate_tokens(items: list[TResponseInputItem]) -> int:
+    """Rough token count of session items, from their serialized length."""
+    return sum(len(json.dumps(item, default=str)) for item in items) // CHARS_PER_TOKEN
+
+
+def _text(content) -> str:
+    """Plain text of a message's content (a string or a list of content parts)."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def _is_summary(item: TResponseInputItem) -> bool:
+    return item.get("role") == "system" and _text(item.get("content")).startswith(SUMMARY_PREFIX)
+
+
+def _is_turn_start(item: TResponseInputItem) -> bool:
+    """Whether an item is a customer message (where a turn begins)."""
+    return item.get("role") == "user" and not _is_summary(item)
+
+
+def _replace_sqlite_items(session: SQLiteSession, items: list[TResponseInputItem]) -> None:
+    """Replace a SQLiteSession's history in a single transaction."""
+    conn = session._get_connection()
+    with session._lock if session._is_memory_db else threading.Lock():
+        with conn:
+            conn.execute(
+                f"INSERT OR IGNORE INTO {session.sessions_table} (session_id) VALUES (?)",
+                (session.session_id,),
+            )
+            conn.execute(f"DELETE FROM {session.messages_table} WHERE session_id = ?", (session.session_id,))
+            conn.executemany(
+                f"INSERT INTO {session.messages_table} (session_id, message_data) VALUES (?, ?)",
+                [(session.session_id, json.dumps(item)) for item in items],
+            )
+            conn.execute(
+                f"UPDATE {session.sessions_table} SET updated_at = CURRENT_TIMESTAMP WHERE session_id = ?",
+                (session.session_id,),
+            )
+
+
+class CompactingSession(SessionABC):
+    """Wraps any session and compacts its history when it grows past a token budget."""
+
+    def __init__(
+        self,
+        session: SessionABC,
+        context: SharedContext | None = None,
+        token_budget: int = TOKEN_BUDGET,
+        keep_recent_items: int = KEEP_RECENT_ITEMS,
+    ):
+        """
+        Args:
+            session: Session that stores the items (SQLiteSession, PooledSession, ...)
+            context: Booking context of the conversation, summarized on compaction
+            token_budget: Estimated history tokens that trigger a compaction
+            keep_recent_items: Minimum number of recent items kept verbatim
+        """
+        self.session = session
+        self.session_id = session.session_id
+        self.context = context
+        self.token_budget = token_budget
+        self.keep_recent_items = keep_recent_items
+
+    # --------- Session ----------
+
+    async def get_items(self, limit: int | None = None) -> list[TResponseInputItem]:
+        return await self.session.get_items(limit)
+
+    async def add_items(self, items: list[TResponseInputItem]) -> None:
+        await self.session.add_items(items)
+        await self.compact()
+
+    async def pop_item(self) -> TResponseInputItem | None:
+        return await self.session.pop_item()
+
+    async def clear_session(self) -> None:
+        await self.session.clear_session()
+
+    # --------- Compaction ----------
+
+    async def _replace_items(self, items: list[TResponseInputItem]) -> None:
+        """
+        Swap the stored history for `items` in one transaction.
+
+        Clearing and re-adding separately would lose the whole history if the
+        process died in between.
+        """
+        if isinstance(self.session, SQLiteSession):
+            await asyncio.to_thread(_replace_sqlite_items, self.session, items)
+        elif hasattr(self.session, "replace_items"):
+            await self.session.replace_items(items)
+        else:
+            # Sessions without a transactional replace
+            await self.session.clear_session()
+            await self.session.add_items(items)
+
+    def _split_index(self, items: list[TResponseInputItem]) -> int | None:
+        """
+        Index of the first item to keep verbatim, or None if nothing can be folded.
+
+        The kept tail starts at a customer message, so a tool call is never
+        separated from its output. It is extended back to the message that
+        opened the turn, or if there is none, shortened to the next one.
+        """
+        start = max(len(items) - self.keep_recent_items, 0)
+        lowest = 2 if items and _is_summary(items[0]) else 1  # Something new must be folded
+
+        for index in range(start, lowest - 1, -1):
+            if _is_turn_start(items[index]):
+                return index
+        for index in range(max(start + 1, lowest), len(items)):
+            if _is_turn_start(items[index]):
+                return index
+        return None
+
+    def _summarize(self, items: list[TResponseInputItem]) -> TResponseInputItem:
+        """Fold older items (and any previous summary among them) into one summary item."""
+        summary = {"booking": None, "customer_requests": [], "confirmed_bookings": []}
+        for item in items:
+            if _is_summary(item):
+                try:
+                    summary.update(json.loads(_text(item["content"])[len(SUMMARY_PREFIX):]))
+                except json.JSONDecodeError:
+                    logger.warning("Dropping an unreadable session summary for %s", self.session_id)
+            elif item.get("role") == "user":
+                summary["customer_requests"].append(_text(item.get("content"))[:SUMMARY_REQUEST_CHARS])
+            elif item.get("type") == "function_call_output":
+                output = _text(item.get("output"))
+                if output.startswith("✅"):
+                    summary["confirmed_bookings"].append(output.splitlines()[0])
+
+        summary["customer_requests"] = summary["customer_requests"][-SUMMARY_REQUESTS:]
+        if self.context is not None and (self.context.name or self.context.contact_num):
+            summary["booking"] = {
+                "name": self.context.name,
+                "contact_num": self.context.contact_num,
+                "start_time": self.context.start_time.isoformat(timespec="minutes"),
+                "end_time": self.context.end_time.isoformat(timespec="minutes"),
+            }
+
+        return {"role": "system", "content": SUMMARY_PREFIX + json.dumps(summary, ensure_ascii=False)}
+
+    async def compact(self, force: bool = False) -> bool:
+        """
+        Replace older items with a summary if the history is over the token budget.
+
+        Args:
+            force: Compact even if the history is within the budget
+
+        Returns:
+            True if the history was compacted
+        """
+        items = await self.session.get_items()
+        if not force and estimate_tokens(items) <= self.token_budget:
+            return False
+
+        split = self._split_index(items)
+        if split is None:
+            return False  # No turn boundary with anything new to fold in
+
+        compacted = [self._summarize(items[:split]), *items[split:]]
+        await self._replace_items(compacted)
+
+        metrics.inc("session_compactions_total")
+        metrics.inc("session_compacted_items_total", split)
+        return True
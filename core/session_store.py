@@ -0,0 +1,351 @@
+"""
+Session storage shared by thousands of conversations.
+
+The SDK's SQLiteSession opens its own connections per session object and
+never forgets anything. SessionStore instead:
+
+- Shares a small pool of SQLite connections in WAL mode
+- Group-commits writes from all sessions in one transaction per flush
+- Keeps an LRU of hot session histories in memory
+- Expires idle sessions and reclaims their space on a schedule
+
+Usage:
+    store = SessionStore("conversations.db")
+    session = store.session("customer-123")   # Pass as Runner.run(session=...)
+"""
+
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from agents.memory import SessionABC
+from agents.items import TResponseInputItem
+
+import logging
+logger = logging.getLogger(__name__)
+
+# --------- Configuration ----------
+POOL_SIZE = 4                       # SQLite connections shared by all sessions
+HOT_SESSIONS = 1024                 # Session histories kept in memory
+FLUSH_INTERVAL_SECONDS = 0.01       # How long writes wait to be batched together
+IDLE_TTL_SECONDS = 30 * 24 * 3600   # Sessions idle this long are deleted
+MAINTENANCE_INTERVAL_SECONDS = 3600
+
+
+class SessionStore:
+    """Pooled, write-batching SQLite store with an in-memory LRU of hot sessions."""
+
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = POOL_SIZE,
+        hot_sessions: int = HOT_SESSIONS,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        idle_ttl: float = IDLE_TTL_SECONDS,
+    ):
+        self.db_path = db_path
+        self.hot_sessions = hot_sessions
+        self.flush_interval = flush_interval
+        self.idle_ttl = idle_ttl
+
+        self._pool: queue.Queue[sqlite3.Connection] = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+
+        # Hot histories, most recently used last
+        self._cache: OrderedDict[str, list[TResponseInputItem]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # Writes waiting for the next group commit
+        self._pending: list[tuple[str, str, float]] = []
+        self._flush_future: asyncio.Future | None = None  # Next commit, still collecting
+        self._committing: set[asyncio.Future] = set()      # Commits being written
+        self._flush_task: asyncio.Task | None = None
+        self._appends = 0  # Bumped on every append, to detect loads racing with writes
+
+        with self._connection() as conn:
+            self._init_db(conn)
+
+    # --------- Connections ----------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, far fewer fsyncs
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """Borrow a connection from the pool."""
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def _init_db(self, conn: sqlite3.Connection) -> None:
+        # Incremental auto-vacuum lets maintenance hand freed pages back to the OS
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS conversation_sessions (
+                session_id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_conversation_sessions_updated_at
+                ON conversation_sessions (updated_at);
+            CREATE TABLE IF NOT EXISTS conversation_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL
+                    REFERENCES conversation_sessions (session_id) ON DELETE CASCADE,
+                message_data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_conversation_messages_session_id
+                ON conversation_messages (session_id, id);
+            """
+        )
+        conn.commit()
+
+    # --------- LRU ----------
+
+    def _cache_get(self, session_id: str) -> list[TResponseInputItem] | None:
+        with self._cache_lock:
+            items = self._cache.get(session_id)
+            if items is not None:
+                self._cache.move_to_end(session_id)
+            return items
+
+    def _cache_put(self, session_id: str, items: list[TResponseInputItem]) -> None:
+        with self._cache_lock:
+            self._cache[session_id] = items
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.hot_sessions:
+                self._cache.popitem(last=False)
+
+    def _cache_drop(self, session_id: str) -> None:
+        with self._cache_lock:
+            self._cache.pop(session_id, None)
+
+    # --------- Reads and writes ----------
+
+    def _load_sync(self, session_id: str) -> list[TResponseInputItem]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT message_data FROM conversation_messages WHERE session_id = ? ORDER BY id",
+                (session_id,),
+            ).fetchall()
+        items = []
+        for (message_data,) in rows:
+            try:
+                items.append(json.loads(message_data))
+            except json.JSONDecodeError:
+                continue  # Skip invalid JSON entries
+        return items
+
+    async def load(self, session_id: str) -> list[TResponseInputItem]:
+        """Return the full history of a session (shared list, do not mutate)."""
+        items = self._cache_get(session_id)
+        if items is None:
+            await self.flush()  # Pending writes must be visible to the load
+            appends = self._appends
+            items = await asyncio.to_thread(self._load_sync, session_id)
+            if appends == self._appends:  # Otherwise the rows read may already be stale
+                self._cache_put(session_id, items)
+        return items
+
+    def _write_sync(self, pending: list[tuple[str, str, float]]) -> None:
+        with self._connection() as conn:
+            with conn:  # One transaction for the whole batch
+                conn.executemany(
+                    """
+                    INSERT INTO conversation_sessions (session_id, updated_at) VALUES (?, ?)
+                    ON CONFLICT(session_id) DO UPDATE SET updated_at = excluded.updated_at
+                    """,
+                    {session_id: updated_at for session_id, _, updated_at in pending}.items(),
+                )
+                conn.executemany(
+                    "INSERT INTO conversation_messages (session_id, message_data) VALUES (?, ?)",
+                    [(session_id, message_data) for session_id, message_data, _ in pending],
+                )
+
+    async def _flush_later(self, future: asyncio.Future) -> None:
+        await asyncio.sleep(self.flush_interval)
+        pending, self._pending = self._pending, []
+        self._flush_future = None
+        self._committing.add(future)
+        try:
+            await asyncio.to_thread(self._write_sync, pending)
+            future.set_result(None)
+        except Exception as e:
+            # Cached histories now hold items the database does not
+            for session_id in {session_id for session_id, _, _ in pending}:
+                self._cache_drop(session_id)
+            future.set_exception(e)
+        finally:
+            self._committing.discard(future)
+
+    async def append(self, session_id: str, items: list[TResponseInputItem]) -> None:
+        """Append items to a session; resolves once they are committed."""
+        if not items:
+            return
+
+        cached = self._cache_get(session_id)
+        if cached is not None:
+            cached.extend(items)
+
+        self._appends += 1
+        now = time.time()
+        self._pending.extend((session_id, json.dumps(item), now) for item in items)
+
+        # Every write in the same window shares one commit
+        if self._flush_future is None:
+            self._flush_future = asyncio.get_running_loop().create_future()
+            self._flush_task = asyncio.create_task(self._flush_later(self._flush_future))
+        await asyncio.shield(self._flush_future)
+
+    async def flush(self) -> None:
+        """Wait for the writes queued so far to be committed."""
+        futures = list(self._committing)
+        if self._flush_future is not None:
+            futures.append(self._flush_future)
+        for future in futures:
+            await asyncio.shield(future)
+
+    def _pop_sync(self, session_id: str) -> TResponseInputItem | None:
+        with self._connection() as conn:
+            with conn:
+                row = conn.execute(
+                    """
+                    DELETE FROM conversation_messages
+                    WHERE id = (SELECT MAX(id) FROM conversation_messages WHERE session_id = ?)
+                    RETURNING message_data
+                    """,
+                    (session_id,),
+                ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+
+    async def pop(self, session_id: str) -> TResponseInputItem | None:
+        """Remove and return the most recent item of a session."""
+        await self.flush()
+        item = await asyncio.to_thread(self._pop_sync, session_id)
+        cached = self._cache_get(session_id)
+        if cached:
+            cached.pop()
+        return item
+
+    def _clear_sync(self, session_id: str) -> None:
+        with self._connection() as conn:
+            with conn:
+                conn.execute("DELETE FROM conversation_sessions WHERE session_id = ?", (session_id,))
+
+    async def clear(self, session_id: str) -> None:
+        """Delete every item of a session."""
+        await self.flush()
+        self._cache_drop(session_id)
+        await asyncio.to_thread(self._clear_sync, session_id)
+
+    def _replace_sync(self, session_id: str, message_data: list[str]) -> None:
+        with self._connection() as conn:
+            with conn:  # Readers see either the old history or the new one
+                conn.execute(
+                    """
+                    INSERT INTO conversation_sessions (session_id, updated_at) VALUES (?, ?)
+                    ON CONFLICT(session_id) DO UPDATE SET updated_at = excluded.updated_at
+                    """,
+                    (session_id, time.time()),
+                )
+                conn.execute("DELETE FROM conversation_messages WHERE session_id = ?", (session_id,))
+                conn.executemany(
+                    "INSERT INTO conversation_messages (session_id, message_data) VALUES (?, ?)",
+                    [(session_id, data) for data in message_data],
+                )
+
+    async def replace(self, session_id: str, items: list[TResponseInputItem]) -> None:
+        """Replace the whole history of a session in one transaction."""
+        await self.flush()
+        self._appends += 1
+        self._cache_drop(session_id)
+        await asyncio.to_thread(self._replace_sync, session_id, [json.dumps(item) for item in items])
+        self._cache_put(session_id, list(items))
+
+    # --------- Maintenance ----------
+
+    def _expire_sync(self, cutoff: float) -> list[str]:
+        with self._connection() as conn:
+            with conn:
+                expired = [
+                    session_id for (session_id,) in conn.execute(
+                        "DELETE FROM conversation_sessions WHERE updated_at < ? RETURNING session_id",
+                        (cutoff,),
+                    ).fetchall()
+                ]
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return expired
+
+    async def expire_idle(self) -> int:
+        """Delete sessions idle longer than idle_ttl and reclaim their space."""
+        await self.flush()
+        expired = await asyncio.to_thread(self._expire_sync, time.time() - self.idle_ttl)
+        for session_id in expired:
+            self._cache_drop(session_id)
+        if expired:
+            logger.info("Expired %d idle sessions", len(expired))
+        return len(expired)
+
+    async def run_maintenance(self, interval: float = MAINTENANCE_INTERVAL_SECONDS) -> None:
+        """Expire idle sessions every `interval` seconds until cancelled."""
+        while True:
+            try:
+                await self.expire_idle()
+            except Exception:
+                logger.exception("Session maintenance failed")
+            await asyncio.sleep(interval)
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    def session(self, session_id: str) -> 'PooledSession':
+        """Return a Session for Runner.run backed by this store."""
+        return PooledSession(session_id, self)
+
+
+class PooledSession(SessionABC):
+    """Agents SDK session backed by a shared SessionStore."""
+
+    def __init__(self, session_id: str, store: SessionStore):
+        self.session_id = session_id
+        self.store = store
+
+    async def get_items(self, limit: int | None = None) -> list[TResponseInputItem]:
+        items = await self.store.load(self.session_id)
+        if limit is not None:
+            return list(items[-limit:]) if limit > 0 else []
+        return list(items)
+
+    async def add_items(self, items: list[TResponseInputItem]) -> None:
+        await self.store.append(self.session_id, items)
+
+    async def pop_item(self) -> TResponseInputItem | None:
+        return await self.store.pop(self.session_id)
+
+    async def clear_session(self) -> None:
+        await self.store.clear(self.session_id)
+
+    async def replace_items(self, items: list[TResponseInputItem]) -> None:
+        await self.store.replace(self.session_id, items)
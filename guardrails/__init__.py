@@ -2,10 +2,12 @@
 Guardrails module for validating agent inputs and outputs.
 """
 
+from guardrails.booking_ledger import booking_ledger
 from guardrails.input.booking_abuse import booking_abuse_guardrail
 #from guardrails.output.pii_filter import pii_output_guardrail
 
 __all__ = [
     "booking_abuse_guardrail",
+    "booking_ledger",
 #    "pii_output_guardrail",
 ]
\ No newline at end of file
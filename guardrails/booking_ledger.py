@@ -0,0 +1,146 @@
+"""
+Deterministic booking quota ledger.
+
+The abuse policy ("flag if they insisted more than 3 times", "no more than 2
+appointments") used to be enforced by asking gpt-4o to count occurrences in
+the whole conversation. The ledger counts them instead, with sliding-window
+counters keyed by session and by contact number:
+
+- attempts:    booking requests made in a session
+- suspicious:  messages with abuse indicators (mass booking, blocking the calendar)
+- bookings:    confirmed appointments, per session and per contact number
+
+The booking tool reserves quota atomically before creating an event, so two
+concurrent conversations cannot both slip past the limit.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+# --------- Configuration ----------
+MAX_SUSPICIOUS_MESSAGES = 3        # Escalate to the detector once a session insists more than this
+SUSPICIOUS_WINDOW_SECONDS = 3600
+MAX_BOOKINGS_PER_CUSTOMER = 2      # Confirmed appointments per session / contact number
+BOOKING_WINDOW_SECONDS = 7 * 24 * 3600
+ATTEMPT_WINDOW_SECONDS = 3600
+TRACKED_KEYS = 50_000              # Counters kept in memory (least recently used dropped)
+
+
+def normalize_contact(contact_num: str) -> str:
+    """Reduce a contact number to its digits so formatting differences share a quota."""
+    return re.sub(r"\D", "", contact_num or "")
+
+
+class BookingLedger:
+    """Sliding-window counters for booking attempts and confirmed bookings."""
+
+    def __init__(
+        self,
+        max_suspicious_messages: int = MAX_SUSPICIOUS_MESSAGES,
+        max_bookings: int = MAX_BOOKINGS_PER_CUSTOMER,
+        tracked_keys: int = TRACKED_KEYS,
+    ):
+        self.max_suspicious_messages = max_suspicious_messages
+        self.max_bookings = max_bookings
+        self.tracked_keys = tracked_keys
+        self._windows = {
+            'attempts': ATTEMPT_WINDOW_SECONDS,
+            'suspicious': SUSPICIOUS_WINDOW_SECONDS,
+            'bookings': BOOKING_WINDOW_SECONDS,
+        }
+        self._lock = threading.Lock()
+        self._events: OrderedDict[tuple[str, str], deque[float]] = OrderedDict()
+
+    # --------- Counters ----------
+
+    def _window(self, kind: str, key: str, now: float) -> deque[float]:
+        """Return the pruned timestamps for a counter. Must be called with the lock held."""
+        events = self._events.get((kind, key))
+        if events is None:
+            events = self._events[(kind, key)] = deque()
+            while len(self._events) > self.tracked_keys:
+                self._events.popitem(last=False)
+        self._events.move_to_end((kind, key))
+
+        cutoff = now - self._windows[kind]
+        while events and events[0] < cutoff:
+            events.popleft()
+        return events
+
+    def _record(self, kind: str, key: str) -> int:
+        now = time.time()
+        with self._lock:
+            events = self._window(kind, key, now)
+            events.append(now)
+            return len(events)
+
+    def _count(self, kind: str, key: str) -> int:
+        with self._lock:
+            return len(self._window(kind, key, time.time()))
+
+    def record_attempt(self, session_id: str) -> int:
+        """Count a booking request in a session; returns the count in the window."""
+        return self._record('attempts', session_id)
+
+    def attempts(self, session_id: str) -> int:
+        return self._count('attempts', session_id)
+
+    def record_suspicious(self, session_id: str) -> int:
+        """Count a message with abuse indicators; returns the count in the window."""
+        return self._record('suspicious', session_id)
+
+    def suspicious(self, session_id: str) -> int:
+        return self._count('suspicious', session_id)
+
+    def bookings(self, session_id: str) -> int:
+        return self._count('bookings', f"session:{session_id}")
+
+    # --------- Policy ----------
+
+    def abuse_reason(self, session_id: str) -> str | None:
+        """Return why a session needs the LLM detector's review, or None if it is within policy."""
+        count = self.suspicious(session_id)
+        if count > self.max_suspicious_messages:
+            return f"{count} messages trying to mass-book or block the calendar"
+        return None
+
+    def try_reserve_booking(self, session_id: str, contact_num: str) -> str | None:
+        """
+        Atomically check the booking quota and count a new booking.
+
+        Call release_booking() if the booking then fails.
+
+        Returns:
+            None if the booking is allowed, otherwise the reason it is not
+        """
+        keys = [f"session:{session_id}"]
+        contact = normalize_contact(contact_num)
+        if contact:
+            keys.append(f"contact:{contact}")
+
+        now = time.time()
+        with self._lock:
+            windows = [self._window('bookings', key, now) for key in keys]
+            if any(len(events) >= self.max_bookings for events in windows):
+                return f"a customer can hold at most {self.max_bookings} appointments at a time"
+            for events in windows:
+                events.append(now)
+            return None
+
+    def release_booking(self, session_id: str, contact_num: str) -> None:
+        """Undo the most recent try_reserve_booking() for a session and contact."""
+        keys = [f"session:{session_id}"]
+        contact = normalize_contact(contact_num)
+        if contact:
+            keys.append(f"contact:{contact}")
+
+        with self._lock:
+            for key in keys:
+                events = self._events.get(('bookings', key))
+                if events:
+                    events.pop()
+
+
+booking_ledger = BookingLedger()
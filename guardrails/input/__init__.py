@@ -1,5 +1,7 @@
 """Input guardrails - run before agent processes user input."""
 
-from guardrails.input.booking_abuse import booking_abuse_guardrail
+from guardrails.input.booking_abuse import booking_abuse_guardrail, booking_verdict_cache
+from guardrails.input.guardrail_gate import wait_for_guardrail
+from guardrails.input.pre_classifier import booking_pre_classifier
 
-__all__ = ["booking_abuse_guardrail"]
\ No newline at end of file
+__all__ = ["booking_abuse_guardrail", "booking_pre_classifier", "booking_verdict_cache", "wait_for_guardrail"]
\ No newline at end of file
@@ -7,6 +7,8 @@ Detects users attempting to:
 - Spam booking requests
 """
 
+import os
+
 from pydantic import BaseModel
 from agents import (
     Agent,
@@ -17,6 +19,13 @@ from agents import (
     input_guardrail,
 )
 
+from core.agent_hooks import model_timing_hooks
+from core.metrics import metrics
+from guardrails.booking_ledger import booking_ledger
+from guardrails.input.guardrail_gate import GUARDRAIL_MODE, guardrail_gates
+from guardrails.input.pre_classifier import booking_pre_classifier, recent_user_texts
+from guardrails.input.verdict_cache import WINDOW_TURNS, VerdictCache, verdict_key
+
 import logging
 logger = logging.getLogger(__name__)
 
@@ -28,11 +37,20 @@ class BookingAbuseAnalysis(BaseModel):
     threat_level: str  # "none", "low", "medium", "high"
     abuse_type: str | None  # e.g., "mass_booking", "slot_hoarding", "spam", None
 
+# Shared by all sessions; set GUARDRAIL_VERDICT_CACHE_PATH to keep verdicts across restarts
+booking_verdict_cache = VerdictCache(
+    BookingAbuseAnalysis,
+    db_path=os.environ.get("GUARDRAIL_VERDICT_CACHE_PATH"),
+)
+
 #Agent
 booking_abuse_detector_instructions = """
 
 You are a security filter for a scheduling system at Pied Piper.
 Analyze the user's message to detect potential booking abuse or denial-of-service attempts.
+You see only the user's most recent messages. Earlier activity in the session is
+summarized by counters in the first message; use them when judging how many times
+the user has insisted.
 
 FLAG AS ABUSE (is_abuse_attempt = True) if the user:
 - User keeps on attempting to book all slots (More than 3 times)
@@ -73,7 +91,9 @@ Be reasonable - some users legitimately need 2 appointments. Focus on obvious ab
 
 
 
-@input_guardrail(run_in_parallel=False)  # BLOCK before booking tool executes
+# BLOCK before the agent starts, or with GUARDRAIL_MODE=parallel run alongside it
+# and only hold back side-effecting tools (see guardrail_gate.py)
+@input_guardrail(run_in_parallel=GUARDRAIL_MODE == "parallel")
 async def booking_abuse_guardrail(
     ctx: RunContextWrapper[None],
     agent: Agent,
@@ -82,13 +102,103 @@ async def booking_abuse_guardrail(
     """
     Detect and block booking abuse attempts.
     
-    Uses blocking execution (run_in_parallel=False) to prevent
-    the booking tool from executing if abuse is detected.
+    By default uses blocking execution (run_in_parallel=False) to prevent
+    the booking tool from executing if abuse is detected. In parallel mode
+    the verdict is published to the session's gate, which the booking tool
+    awaits before creating an event.
+    """
+    session_key = getattr(ctx.context, "session_id", "") or str(id(ctx.context))
+    gate = guardrail_gates.get(session_key)
+    gate.begin()
+    try:
+        with metrics.timer("guardrail_seconds"):
+            tier, output = await _evaluate_booking_abuse(session_key, input)
+    except BaseException:
+        gate.resolve(False, "the security check failed")  # Fail closed
+        raise
+
+    metrics.inc(
+        "guardrail_decisions_total",
+        tier=tier,
+        outcome="blocked" if output.tripwire_triggered else "allowed",
+    )
+    gate.resolve(not output.tripwire_triggered, output.output_info.reasoning)
+    return output
+
+
+def _detector_input(texts: list[str], counters: tuple[int, int, int]) -> list[TResponseInputItem]:
+    """
+    Build a bounded input for the detector.
+
+    Forwarding the whole conversation makes the detector's cost grow with the
+    chat. Instead it sees the last WINDOW_TURNS user messages plus the
+    ledger's counters for everything before them.
+    """
+    attempts, suspicious, bookings = counters
+    summary = (
+        "Session summary (earlier messages omitted): "
+        f"{attempts} recent booking requests, "
+        f"{suspicious} recent messages with abuse indicators, "
+        f"{bookings} confirmed appointments."
+    )
+    return [{"role": "system", "content": summary}] + [
+        {"role": "user", "content": text} for text in texts
+    ]
+
+
+async def _evaluate_booking_abuse(
+    session_key: str,
+    input: str | list[TResponseInputItem]
+) -> tuple[str, GuardrailFunctionOutput]:
+    """
+    Return the guardrail output and the tier that decided it
+    ('pre_classifier', 'verdict_cache' or 'detector').
+
+    Obviously benign messages are cleared by the local pre-classifier
+    without calling the LLM detector. Sessions the booking ledger flags for
+    repeated abuse indicators always go to the detector, which sees the
+    ledger's counters and makes the blocking decision.
     """
 
+    # Fast local tier: skip the LLM for clearly benign messages
+    cleared_reason = booking_pre_classifier.classify(session_key, input)
 
-    result = await Runner.run(booking_abuse_detector, input)
-    analysis = result.final_output
+    # Repeated abuse indicators: never clear locally, let the detector judge
+    abuse_reason = booking_ledger.abuse_reason(session_key)
+    if abuse_reason is not None:
+        logger.warning(
+            "🚨 Session flagged by the booking ledger, escalating to the detector",
+            extra={"session_id": session_key, "reasoning": abuse_reason},
+        )
+        cleared_reason = None
+
+    if cleared_reason is not None:
+        return "pre_classifier", GuardrailFunctionOutput(
+            output_info=BookingAbuseAnalysis(
+                is_abuse_attempt=False,
+                reasoning=f"Cleared by local pre-classifier: {cleared_reason}",
+                threat_level="none",
+                abuse_type=None,
+            ),
+            tripwire_triggered=False,
+        )
+
+    # Reuse the verdict for an equivalent recent input window
+    texts = recent_user_texts(input, WINDOW_TURNS)
+    counters = (
+        booking_ledger.attempts(session_key),
+        booking_ledger.suspicious(session_key),
+        booking_ledger.bookings(session_key),
+    )
+    cache_key = verdict_key(texts, counters)
+    tier = "verdict_cache"
+    analysis = booking_verdict_cache.get(cache_key)
+    if analysis is None:
+        tier = "detector"
+        result = await Runner.run(booking_abuse_detector, _detector_input(texts, counters))
+        metrics.record_usage(result.context_wrapper.usage, agent=booking_abuse_detector.name)
+        analysis = result.final_output
+        booking_verdict_cache.put(cache_key, analysis)
 
     # Log suspicious activity (silent alarm)
     if analysis.is_abuse_attempt or analysis.threat_level in ["medium", "high"]:
@@ -106,8 +216,8 @@ async def booking_abuse_guardrail(
     # Only block high-threat attempts
     should_block = analysis.is_abuse_attempt and analysis.threat_level == "high"
     
-    return GuardrailFunctionOutput(
-        output_info=result.final_output,
+    return tier, GuardrailFunctionOutput(
+        output_info=analysis,
         tripwire_triggered=should_block, # <-- Change to False if you want to never block, just monitor
     )
 
@@ -117,5 +227,6 @@ booking_abuse_detector = Agent(
     model="gpt-4o",
     instructions=booking_abuse_detector_instructions,
     output_type=BookingAbuseAnalysis,
+    hooks=model_timing_hooks,
 )
 
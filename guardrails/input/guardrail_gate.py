@@ -0,0 +1,89 @@
+"""
+Verdict gate for running the booking abuse guardrail in parallel.
+
+With GUARDRAIL_MODE=parallel the guardrail runs concurrently with the front
+desk agent instead of before it, so availability questions no longer wait
+for the detector. Tools with side effects (booking, and any future write
+tools) must call wait_for_guardrail() first: it returns once the current
+turn's verdict is known, and reports whether the tool may proceed.
+Read-only tools do not wait.
+
+The guardrail opens the gate as soon as it starts, which is long before the
+model can answer with a tool call. The gate fails closed: side effects are
+refused if the guardrail errors, takes longer than GATE_TIMEOUT_SECONDS, or
+never recorded a verdict for the session at all.
+"""
+
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+
+# --------- Configuration ----------
+GUARDRAIL_MODE = os.environ.get("GUARDRAIL_MODE", "blocking")  # 'blocking' or 'parallel'
+GATE_TIMEOUT_SECONDS = 30
+TRACKED_SESSIONS = 10_000  # Gates kept in memory (least recently used dropped)
+
+
+class GuardrailGate:
+    """The guardrail verdict of a session's current turn."""
+
+    def __init__(self):
+        self._verdict: asyncio.Future | None = None
+
+    def begin(self) -> None:
+        """Start a new turn; waiters block until resolve() is called."""
+        self._verdict = asyncio.get_running_loop().create_future()
+
+    def resolve(self, allowed: bool, reason: str = "") -> None:
+        """Publish the verdict of the current turn."""
+        if self._verdict is not None and not self._verdict.done():
+            self._verdict.set_result((allowed, reason))
+
+    async def wait(self, timeout: float = GATE_TIMEOUT_SECONDS) -> str | None:
+        """
+        Wait for the current turn's verdict.
+
+        Returns:
+            None if side effects are allowed, otherwise the reason they are not
+        """
+        if self._verdict is None:
+            # The guardrail never ran for this session (or its gate was evicted)
+            return "no security check was recorded for this conversation"
+        try:
+            allowed, reason = await asyncio.wait_for(asyncio.shield(self._verdict), timeout)
+        except asyncio.TimeoutError:
+            return "the security check did not finish in time"
+        return None if allowed else reason
+
+
+class GuardrailGates:
+    """Per-session gates, bounded by least recent use."""
+
+    def __init__(self, tracked_sessions: int = TRACKED_SESSIONS):
+        self.tracked_sessions = tracked_sessions
+        self._lock = threading.Lock()
+        self._gates: OrderedDict[str, GuardrailGate] = OrderedDict()
+
+    def get(self, session_key: str) -> GuardrailGate:
+        with self._lock:
+            gate = self._gates.get(session_key)
+            if gate is None:
+                gate = self._gates[session_key] = GuardrailGate()
+                while len(self._gates) > self.tracked_sessions:
+                    self._gates.popitem(last=False)
+            self._gates.move_to_end(session_key)
+            return gate
+
+
+guardrail_gates = GuardrailGates()
+
+
+async def wait_for_guardrail(session_key: str) -> str | None:
+    """
+    Call from a side-effecting tool before it acts.
+
+    Returns:
+        None if the tool may proceed, otherwise the reason it must not
+    """
+    return await guardrail_gates.get(session_key).wait()
@@ -0,0 +1,157 @@
+"""
+Local rule-based pre-classifier for the booking abuse guardrail.
+
+Most messages ("what times are free tomorrow?", "my number is 555-1234") are
+obviously benign and do not need a gpt-4o call. This tier looks at keyword
+and regex features of the latest user message plus per-session booking
+counters from the booking ledger, and clears such messages in microseconds.
+Anything risky or ambiguous is escalated to the LLM detector.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+
+from agents import TResponseInputItem
+
+from guardrails.booking_ledger import BookingLedger, booking_ledger
+
+# --------- Configuration ----------
+MAX_CLEARED_BOOKING_REQUESTS = 2   # Booking requests per session cleared without the LLM
+MAX_CLEARED_LENGTH = 400           # Longer messages always go to the LLM
+
+# Patterns that suggest slot hoarding or mass booking
+RISKY_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in [
+        r"\b(all|every|each)\b.{0,30}\b(slots?|times?|openings?|appointments?|availability|schedules?)\b",
+        r"\b(block|fill|hoard|reserve|take)\b.{0,20}\b(up|out|everything|all|entire|whole)\b",
+        r"\b(entire|whole|full)\s+(calendar|day|week|month|schedule)\b",
+        r"\b([3-9]|\d{2,}|three|four|five|six|seven|eight|nine|ten|dozen|multiple|several)\s+(appointments?|slots?|bookings?|sessions?|people|persons)\b",
+        r"\bno\s?one else\b",
+        r"\b(fuck|shit|damn|idiot|stupid)\b",
+    ]
+]
+
+_WHEN = r"(today|tonight|tomorrow|next|this|monday|tuesday|wednesday|thursday|friday|saturday|sunday|\d+)"
+# Booking intent only: a booking verb with an object or a time. Availability
+# questions ("what slots are open on Monday?") are not booking requests.
+BOOKING_PATTERN = re.compile(
+    rf"\b(book|reserve)\s+(me|us|him|her|them|it|that|this|one|an?|the|my|all|every|each|everything|for|at|on|in|{_WHEN})\b"
+    rf"|\bschedule\s+(me|us|him|her|them|it|that|this|one|an?|my|{_WHEN})\b"
+    r"|\b(i'?d like|i would like|i want|i need|can i|could i|let me|want to|like to)\s+(to\s+)?(book|reserve|schedule)\b"
+    r"|\bmake\s+(an?|my)\s+(appointment|booking|reservation)\b"
+    r"|\bsign\s+(me|us)\s+up\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class PreClassifierStats:
+    """Counters for how often the LLM detector was skipped."""
+    total: int = 0
+    short_circuited: int = 0
+    escalated: int = 0
+
+    @property
+    def short_circuit_rate(self) -> float:
+        return self.short_circuited / self.total if self.total else 0.0
+
+
+def _item_text(item) -> str | None:
+    """Return the text of a user message item, or None for other items."""
+    if not isinstance(item, dict) or item.get('role') != 'user':
+        return None
+    content = item.get('content')
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            part.get('text', '') for part in content
+            if isinstance(part, dict) and part.get('type') == 'input_text'
+        )
+    return None
+
+
+def recent_user_texts(input: str | list[TResponseInputItem], turns: int) -> list[str]:
+    """Return the text of the last `turns` user messages, oldest first."""
+    if isinstance(input, str):
+        return [input]
+
+    texts = []
+    for item in reversed(input):
+        text = _item_text(item)
+        if text is not None:
+            texts.append(text)
+            if len(texts) == turns:
+                break
+    return texts[::-1]
+
+
+def latest_user_text(input: str | list[TResponseInputItem]) -> str:
+    """Return the text of the most recent user message in a guardrail input."""
+    texts = recent_user_texts(input, 1)
+    return texts[0] if texts else ""
+
+
+class BookingPreClassifier:
+    """Clears obviously benign messages and escalates everything else."""
+
+    def __init__(
+        self,
+        ledger: BookingLedger,
+        max_cleared_booking_requests: int = MAX_CLEARED_BOOKING_REQUESTS,
+        max_cleared_length: int = MAX_CLEARED_LENGTH,
+    ):
+        self.ledger = ledger
+        self.max_cleared_booking_requests = max_cleared_booking_requests
+        self.max_cleared_length = max_cleared_length
+        self.stats = PreClassifierStats()
+        self._lock = threading.Lock()
+
+    def booking_requests(self, session_key: str) -> int:
+        """Number of booking requests counted for a session so far."""
+        return self.ledger.attempts(session_key)
+
+    def classify(self, session_key: str, input: str | list[TResponseInputItem]) -> str | None:
+        """
+        Decide whether a message can skip the LLM detector.
+
+        Booking requests and messages with abuse indicators are counted in
+        the ledger as a side effect.
+
+        Returns:
+            A short reason if the message is clearly benign, or None if it
+            must be escalated to the LLM detector
+        """
+        text = latest_user_text(input)
+        reason = self._classify_text(session_key, text)
+
+        with self._lock:
+            self.stats.total += 1
+            if reason is None:
+                self.stats.escalated += 1
+            else:
+                self.stats.short_circuited += 1
+
+        return reason
+
+    def _classify_text(self, session_key: str, text: str) -> str | None:
+        is_booking_request = BOOKING_PATTERN.search(text) is not None
+        count = self.ledger.record_attempt(session_key) if is_booking_request else 0
+
+        if any(pattern.search(text) for pattern in RISKY_PATTERNS):
+            self.ledger.record_suspicious(session_key)
+            return None
+
+        if not text.strip() or len(text) > self.max_cleared_length:
+            return None
+
+        if is_booking_request:
+            if count > self.max_cleared_booking_requests:
+                return None  # Repeated booking requests: let the LLM look at the pattern
+            return f"booking request {count} of this session with no abuse indicators"
+
+        return "no booking or abuse indicators"
+
+
+booking_pre_classifier = BookingPreClassifier(booking_ledger)
@@ -0,0 +1,141 @@
+"""
+Verdict cache for the booking abuse detector.
+
+Users keep sending near-identical messages ("hi", "what's available?", "book
+me tomorrow at 2pm"). The detector's BookingAbuseAnalysis for such inputs is
+cached under a normalized form of the recent input window plus the session's
+ledger counters, so repeated phrasings do not cost a model call.
+
+The cache is bounded (LRU), entries expire after a TTL, and it is shared by all
+sessions. An optional SQLite file keeps verdicts across restarts.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from pydantic import BaseModel
+
+# --------- Configuration ----------
+MAX_ENTRIES = 10_000
+TTL_SECONDS = 24 * 3600
+WINDOW_TURNS = 3  # User messages shown to the detector and used in the cache key
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_MONTHS = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*"
+# Dates and times are masked; other numbers (e.g. how many appointments) are kept
+_DATES_AND_TIMES = re.compile(
+    rf"\b{_MONTHS}\s+\d{{1,2}}(st|nd|rd|th)?\b"           # jan 5, january 5th
+    rf"|\b\d{{1,2}}(st|nd|rd|th)?\s+(of\s+)?{_MONTHS}\b"  # 5 jan, 5th of january
+    r"|\b\d{4}-\d{1,2}-\d{1,2}\b"                         # 2026-01-05
+    r"|\b\d{1,2}/\d{1,2}(/\d{2,4})?\b"                    # 1/5, 1/5/2026
+    r"|\b\d{1,2}(:\d{2})?\s*(am|pm)\b"                    # 2pm, 2:30 pm
+    r"|\b\d{1,2}:\d{2}\b"                                 # 14:30
+    r"|\b\d{1,2}(st|nd|rd|th)\b",                         # the 5th
+    re.IGNORECASE,
+)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a message so trivially different phrasings share a key.
+
+    Lowercases, replaces dates and times with a placeholder, drops
+    punctuation and collapses whitespace ("Book me at 2pm!" and "book me at
+    3pm" match). Other numbers are kept, so "book 2 appointments" and "book
+    10 appointments" get separate verdicts.
+    """
+    text = _DATES_AND_TIMES.sub(" _ ", text.lower())
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def verdict_key(texts: list[str], counters: tuple[int, ...]) -> str:
+    """Cache key for a window of user messages and the session's ledger counters."""
+    normalized = "\x1f".join(normalize_text(text) for text in texts)
+    state = ",".join(str(count) for count in counters)
+    return hashlib.sha256(f"{state}\x1e{normalized}".encode()).hexdigest()
+
+
+class VerdictCache:
+    """Bounded, TTL-evicted cache of detector verdicts with optional disk backing."""
+
+    def __init__(
+        self,
+        model: type[BaseModel],
+        max_entries: int = MAX_ENTRIES,
+        ttl_seconds: float = TTL_SECONDS,
+        db_path: str | None = None,
+    ):
+        self.model = model
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, BaseModel]] = OrderedDict()
+
+        self._db: sqlite3.Connection | None = None
+        if db_path is not None:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, analysis TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM verdicts WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+            self._load()
+
+    def _load(self) -> None:
+        """Warm the in-memory LRU from disk, newest entries last."""
+        rows = self._db.execute(
+            "SELECT key, analysis, expires_at FROM verdicts ORDER BY expires_at DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for key, analysis, expires_at in reversed(rows):
+            self._entries[key] = (expires_at, self.model.model_validate_json(analysis))
+
+    def get(self, key: str) -> BaseModel | None:
+        """Return the cached verdict for a key, if present and not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.time():
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, analysis: BaseModel) -> None:
+        """Store a verdict, evicting the least recently used entries if full."""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, analysis)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                if self._db is not None:
+                    self._db.execute("DELETE FROM verdicts WHERE key = ?", (evicted,))
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO verdicts (key, analysis, expires_at) VALUES (?, ?, ?)",
+                    (key, analysis.model_dump_json(), expires_at),
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM verdicts")
+                self._db.commit()
@@ -7,16 +7,22 @@ This agent can:
 """
 
 import os
-from datetime import datetime
+from datetime import date, datetime
+from typing import Literal
 
-from agents import Agent, RunContextWrapper, function_tool
+from agents import Agent, ModelSettings, RunContextWrapper, function_tool
 from agents import set_tracing_export_api_key
-from agents.extensions.models.litellm_model import LitellmModel
 
+from core.agent_hooks import model_timing_hooks
+from core.lazy_model import LazyModel
 from core.context import SharedContext
-from services.google_calendar import get_available_schedule, create_calendar_event
+from core.metrics import metrics
+from services.google_calendar import SlotUnavailableError, get_available_schedule_async, create_calendar_event_async
+from services.google_calendar import BUSINESS_HOURS_END, BUSINESS_HOURS_START, TIMEZONE
 
+from guardrails.booking_ledger import booking_ledger
 from guardrails.input.booking_abuse import booking_abuse_guardrail
+from guardrails.input.guardrail_gate import wait_for_guardrail
 
 # --------- For Non OpenAI Models w/ Tracing ----------
 # Agent(model="gpt-5.2", ...)
@@ -28,31 +34,39 @@ tracing_api_key = os.environ["OPENAI_API_KEY"]
 set_tracing_export_api_key(tracing_api_key)
 
 # Configure LiteLLM model with Claude Sonnet
-model = LitellmModel(
-    model="anthropic/claude-sonnet-4-5-20250929",  # No 'litellm/' prefix needed
-    api_key=os.environ["ANTHROPIC_API_KEY"],
-)
+FRONT_DESK_MODEL = "anthropic/claude-sonnet-4-5-20250929"  # No 'litellm/' prefix needed
+
+
+def _build_model():
+    # Imported here: LiteLLM dominates import time, so it loads with the first turn
+    from agents.extensions.models.litellm_model import LitellmModel
+
+    return LitellmModel(
+        model=FRONT_DESK_MODEL,
+        api_key=os.environ["ANTHROPIC_API_KEY"],
+    )
+
+
+model = LazyModel(_build_model, FRONT_DESK_MODEL)
 
 # --------- Instructions ----------
+# The static prefix never changes; only the short suffix (today's date, business
+# hours) is rebuilt on every run.
 
-def get_front_desk_instructions() -> str:
-    """Generate instructions with current date context."""
-    current_date = datetime.now().strftime("%A, %B %d, %Y")
-    current_year = datetime.now().year
-    
-    return f"""You are the front desk for the startup called Pied Piper.
+PROMPT_CACHE_MIN_TOKENS = 1024  # Anthropic ignores cache_control on shorter prompts
+CHARS_PER_TOKEN = 4             # Rough token estimate, no tokenizer needed
 
-IMPORTANT: Today's date is {current_date}. The current year is {current_year}.
-When booking appointments, ALWAYS use the year {current_year} unless the user specifically requests a different year.
+FRONT_DESK_STATIC_INSTRUCTIONS = """You are the front desk for the startup called Pied Piper.
 
 Your responsibilities:
 - If the user asks what available schedule you have, execute your `check_available_schedule` tool
 - If the user requests to book an appointment, execute your `book_an_appointment` tool
-- When the user provides a date without a year, assume they mean {current_year}
+- When booking appointments, ALWAYS use the current year (given below) unless the user specifically requests a different year
+- When the user provides a date without a year, assume they mean the current year
 - Never book appointments in the past
 
 Guidelines:
-- Allow booking from 9am - 5pm only. If outside the timeframe, do not accept.
+- Allow booking within business hours (given below) only. If outside the timeframe, do not accept.
 - Be aware that some clients might abuse the system. 
 
 Abusive Cases: 
@@ -61,31 +75,96 @@ Abusive Cases:
 - Client might on purposely ask to block the full calendar, respond by only booking once or twice. 
 - Client might book more than 2 hours in order to block the day, ask nicely why, if it doens't make sense do not tolerate.
 - Client might curse at you or be angry, be understanding, but do not tolerate if the client continues to have a bad behavior.
+"""
+
+
+def _format_hour(hour: int) -> str:
+    return datetime.min.replace(hour=hour).strftime("%I:%M %p").lstrip("0")
+
 
+def get_front_desk_dynamic_instructions() -> str:
+    """Generate the per-run suffix: current date and business hours."""
+    now = datetime.now()
+    return f"""
+IMPORTANT: Today's date is {now.strftime("%A, %B %d, %Y")}. The current year is {now.year}.
+Business hours: {_format_hour(BUSINESS_HOURS_START)} - {_format_hour(BUSINESS_HOURS_END)} ({TIMEZONE}), Monday to Friday.
 """
 
-front_desk_agent_instructions = get_front_desk_instructions()
+
+def get_front_desk_instructions(
+    ctx: RunContextWrapper[SharedContext] | None = None,
+    agent: Agent[SharedContext] | None = None
+) -> str:
+    """Generate instructions with current date context (static prefix + dynamic suffix)."""
+    return FRONT_DESK_STATIC_INSTRUCTIONS + get_front_desk_dynamic_instructions()
+
+
+def get_front_desk_model_settings(model_name: str) -> ModelSettings:
+    """
+    Mark the system prompt for Anthropic prompt caching once it is large enough.
+
+    Anthropic only caches prompts of at least PROMPT_CACHE_MIN_TOKENS, and the
+    static instructions are currently far shorter, so no breakpoint is set
+    until they outgrow that. Confirm hits with llm_cached_input_tokens_total
+    before counting on any savings.
+    """
+    is_anthropic = "anthropic" in model_name or "claude" in model_name
+    static_tokens = len(FRONT_DESK_STATIC_INSTRUCTIONS) // CHARS_PER_TOKEN
+    if is_anthropic and static_tokens >= PROMPT_CACHE_MIN_TOKENS:
+        return ModelSettings(
+            extra_args={"cache_control_injection_points": [{"location": "message", "role": "system"}]}
+        )
+    return ModelSettings()
 
 # --------- Tools ------------
 
 @function_tool
-async def check_available_schedule() -> str:
+@metrics.timed("tool_seconds", tool="check_available_schedule")
+async def check_available_schedule(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    min_duration_minutes: int = 0,
+    time_of_day: Literal["morning", "afternoon"] | None = None,
+    limit: int | None = None
+) -> str:
     """
     Check available schedule by querying Google Calendar.
-    Returns available time slots for the next 7 business days.
+    Returns free time ranges (the next 7 days unless dates are given) as JSON:
+    {"tz": timezone, "free": {"YYYY-MM-DD": ["HH:MM-HH:MM", ...]}}.
+    Dates without free time are omitted. For a request like "the first free
+    hour next Tuesday afternoon", pass that date as start and end date,
+    min_duration_minutes=60, time_of_day="afternoon" and limit=1.
+    
+    Args:
+        start_date: First date to check (YYYY-MM-DD), default today
+        end_date: Last date to check (YYYY-MM-DD), inclusive
+        min_duration_minutes: Only return free ranges at least this many minutes long
+        time_of_day: Only return morning or afternoon ranges
+        limit: Return at most this many ranges, earliest first
     """
+    # Read-only: does not wait for the guardrail in parallel mode
     print("📅 Checking available schedule from Google Calendar...")
     
     try:
-        return get_available_schedule()
+        return await get_available_schedule_async(
+            start_date=start_date,
+            end_date=end_date,
+            min_duration_minutes=min_duration_minutes,
+            time_of_day=time_of_day,
+            limit=limit,
+            compact=True
+        )
     except FileNotFoundError:
+        metrics.inc("tool_errors_total", tool="check_available_schedule")
         return "❌ Error: credentials.json not found. Please set up Google Calendar API credentials."
     except Exception as e:
+        metrics.inc("tool_errors_total", tool="check_available_schedule")
         print(f"Error checking calendar: {e}")
         return f"❌ Error checking calendar availability: {str(e)}"
 
 
 @function_tool
+@metrics.timed("tool_seconds", tool="book_an_appointment")
 async def book_an_appointment(
     ctx: RunContextWrapper[SharedContext],
     name: str,
@@ -103,7 +182,20 @@ async def book_an_appointment(
         end_time: Appointment end time
     """
     print("📌 Booking appointment...")
-    
+    session_key = ctx.context.session_id or str(id(ctx.context))
+
+    # Side effect: wait for this turn's guardrail verdict (parallel mode)
+    blocked_reason = await wait_for_guardrail(session_key)
+    if blocked_reason is not None:
+        metrics.inc("booking_rejections_total", reason="guardrail")
+        return f"❌ Booking not allowed: {blocked_reason}"
+
+    # Enforce the per-customer quota before touching the calendar
+    quota_reason = booking_ledger.try_reserve_booking(session_key, contact_num)
+    if quota_reason is not None:
+        metrics.inc("booking_rejections_total", reason="quota")
+        return f"❌ Booking not allowed: {quota_reason}."
+
     try:
         # Store in context
         ctx.context.name = name
@@ -111,20 +203,31 @@ async def book_an_appointment(
         ctx.context.start_time = start_time
         ctx.context.end_time = end_time
         
-        # Create event in Google Calendar
-        event = create_calendar_event(
+        # Create event in Google Calendar; the slot is leased so concurrent
+        # conversations cannot book it at the same time
+        event = await create_calendar_event_async(
             summary=f"Appointment: {name}",
             description=f"Customer: {name}\nContact: {contact_num}",
             start_time=start_time,
-            end_time=end_time
+            end_time=end_time,
+            lease_holder=session_key
         )
         
+        metrics.inc("bookings_total")
         event_link = event.get('htmlLink', '')
         return f"✅ Appointment booked for {name} from {start_time} to {end_time}\n📎 Calendar link: {event_link}"
         
+    except SlotUnavailableError as e:
+        booking_ledger.release_booking(session_key, contact_num)
+        metrics.inc("booking_rejections_total", reason="slot_taken")
+        return f"❌ That time is no longer available ({e}). Please choose another slot."
     except FileNotFoundError:
+        booking_ledger.release_booking(session_key, contact_num)
+        metrics.inc("tool_errors_total", tool="book_an_appointment")
         return "❌ Error: credentials.json not found. Please set up Google Calendar API credentials."
     except Exception as e:
+        booking_ledger.release_booking(session_key, contact_num)
+        metrics.inc("tool_errors_total", tool="book_an_appointment")
         print(f"Error booking appointment: {e}")
         return f"❌ Error booking appointment: {str(e)}"
 
@@ -135,7 +238,9 @@ front_desk_agent = Agent[SharedContext](
     name="Front Desk Agent",
     model=model,
     #model="gpt-5.2",
-    instructions=front_desk_agent_instructions,
+    instructions=get_front_desk_instructions,  # Re-evaluated every run, so the date never goes stale
+    model_settings=get_front_desk_model_settings(model.model),
     tools=[check_available_schedule, book_an_appointment],
     input_guardrails=[booking_abuse_guardrail],
+    hooks=model_timing_hooks,
 )
@@ -0,0 +1,72 @@
+"""
+Admin script for importing many appointments at once.
+
+Reads bookings from a CSV file and creates them with Google HTTP batch
+requests. Every row is validated and checked for conflicts first; the result
+of each row is reported individually.
+
+CSV columns: name, contact_num, start_time, end_time, attendee_email (optional)
+Times use ISO format, e.g. 2026-03-02T14:00
+
+Usage:
+    uv run python scripts/bulk_book_appointments.py bookings.csv
+    uv run python scripts/bulk_book_appointments.py bookings.csv --allow-conflicts
+"""
+import argparse
+import csv
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Allow running as a plain script from the project root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.google_calendar import create_calendar_events_bulk
+
+
+def load_bookings(path: str) -> list[dict]:
+    """Read CSV rows into create_calendar_events_bulk() items."""
+    items = []
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            try:
+                start_time = datetime.fromisoformat(row['start_time'])
+                end_time = datetime.fromisoformat(row['end_time'])
+            except (KeyError, TypeError, ValueError):
+                # Let the service report the row as invalid
+                start_time = row.get('start_time')
+                end_time = row.get('end_time')
+
+            items.append({
+                'summary': f"Appointment: {row.get('name', '')}",
+                'description': f"Customer: {row.get('name', '')}\nContact: {row.get('contact_num', '')}",
+                'start_time': start_time,
+                'end_time': end_time,
+                'attendee_email': row.get('attendee_email') or None,
+            })
+    return items
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bulk import appointments into Google Calendar')
+    parser.add_argument('file', help='CSV file with the bookings to import')
+    parser.add_argument('--allow-conflicts', action='store_true',
+                        help='Book rows even if they overlap existing events')
+    args = parser.parse_args()
+
+    items = load_bookings(args.file)
+    print(f"📥 Importing {len(items)} bookings from {args.file}...")
+
+    results = create_calendar_events_bulk(items, allow_conflicts=args.allow_conflicts)
+
+    print()
+    for result in results:
+        row = result['index'] + 2  # Header is row 1
+        if result['status'] == 'created':
+            print(f"   ✅ Row {row}: {result['event'].get('htmlLink', result['event'].get('id'))}")
+        else:
+            print(f"   ❌ Row {row} ({result['status']}): {result['error']}")
+
+    created = sum(1 for result in results if result['status'] == 'created')
+    print("\n" + "="*50)
+    print(f"🎉 Created {created} of {len(results)} bookings")
@@ -13,7 +13,11 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 
 # If modifying scopes, delete token.json
-SCOPES = ['https://www.googleapis.com/auth/calendar.events']
+# Must match SCOPES in services/google_calendar.py, which refreshes this token
+SCOPES = [
+    'https://www.googleapis.com/auth/calendar.events',
+    'https://www.googleapis.com/auth/calendar.freebusy',
+]
 
 def get_calendar_service():
     """Create and return an authorized Calendar API service."""
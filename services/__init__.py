@@ -4,6 +4,14 @@ from services.google_calendar import (
     get_calendar_service,
     get_available_schedule,
     create_calendar_event,
+    create_calendar_events_bulk,
+    find_staff_availability,
+    find_available_slots,
+    get_available_schedule_async,
+    create_calendar_event_async,
+    SlotUnavailableError,
+    sync_calendar_mirror,
+    run_calendar_sync,
     validate_and_fix_datetime,
     BUSINESS_HOURS_START,
     BUSINESS_HOURS_END,
@@ -15,6 +23,14 @@ __all__ = [
     "get_calendar_service",
     "get_available_schedule", 
     "create_calendar_event",
+    "create_calendar_events_bulk",
+    "find_staff_availability",
+    "find_available_slots",
+    "get_available_schedule_async",
+    "create_calendar_event_async",
+    "SlotUnavailableError",
+    "sync_calendar_mirror",
+    "run_calendar_sync",
     "validate_and_fix_datetime",
     "BUSINESS_HOURS_START",
     "BUSINESS_HOURS_END",
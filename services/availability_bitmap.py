@@ -0,0 +1,205 @@
+"""
+Vectorized availability engine for many calendars at once.
+
+Each calendar's business-hours occupancy is stored as a row of a NumPy boolean
+bitmap with one cell per time step (15 minutes by default). Questions such as
+"when is everyone free" or "earliest 60-minute slot when any 2 of 5 staff are
+free" then become array reductions instead of nested loops over events.
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable
+
+import numpy as np
+
+# --------- Configuration ----------
+GRANULARITY_MINUTES = 15
+
+
+class AvailabilityGrid:
+    """
+    Occupancy bitmap of shape (calendars, business days, steps per day).
+
+    A cell is True when the calendar is busy for any part of that time step,
+    so free cells are always fully free.
+    """
+
+    def __init__(
+        self,
+        calendar_ids: list[str],
+        start_date: datetime,
+        days: int,
+        day_start_hour: int,
+        day_end_hour: int,
+        granularity_minutes: int = GRANULARITY_MINUTES,
+        skip_weekends: bool = True,
+    ):
+        self.calendar_ids = list(calendar_ids)
+        self.granularity = timedelta(minutes=granularity_minutes)
+        self.day_start_hour = day_start_hour
+
+        start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.origin = start_date
+        self.days = days
+        self._day_offsets = [
+            offset for offset in range(days)
+            if not (skip_weekends and (start_date + timedelta(days=offset)).weekday() >= 5)
+        ]
+        self.dates = [start_date + timedelta(days=offset) for offset in self._day_offsets]
+        self._day_index = {day.date(): i for i, day in enumerate(self.dates)}
+        self._calendar_index = {calendar_id: i for i, calendar_id in enumerate(self.calendar_ids)}
+
+        self._first_step = day_start_hour * 60 // granularity_minutes
+        steps_per_day = (day_end_hour - day_start_hour) * 60 // granularity_minutes
+        self.busy = np.zeros((len(self.calendar_ids), len(self.dates), steps_per_day), dtype=bool)
+
+    @classmethod
+    def from_busy_times(
+        cls,
+        busy_by_calendar: dict[str, Iterable[tuple[datetime, datetime]]],
+        start_date: datetime,
+        days: int,
+        day_start_hour: int,
+        day_end_hour: int,
+        granularity_minutes: int = GRANULARITY_MINUTES,
+    ) -> 'AvailabilityGrid':
+        """Build a grid from busy periods keyed by calendar ID."""
+        grid = cls(
+            list(busy_by_calendar), start_date, days,
+            day_start_hour, day_end_hour, granularity_minutes,
+        )
+        for calendar_id, busy_times in busy_by_calendar.items():
+            grid.mark_busy_many(calendar_id, busy_times)
+        return grid
+
+    # --------- Building ----------
+
+    def _day_start(self, day: int) -> datetime:
+        return self.dates[day].replace(hour=self.day_start_hour)
+
+    def mark_busy(self, calendar_id: str, start: datetime, end: datetime) -> None:
+        """Mark [start, end) busy for a calendar, on every day it spans."""
+        row = self._calendar_index[calendar_id]
+        steps = self.busy.shape[2]
+        step_seconds = self.granularity.total_seconds()
+
+        current = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while current < end:
+            day = self._day_index.get(current.date())
+            if day is not None:
+                day_start = self._day_start(day)
+                first = int((start - day_start).total_seconds() // step_seconds)
+                last = -int(-(end - day_start).total_seconds() // step_seconds)  # ceil
+                first, last = max(first, 0), min(last, steps)
+                if first < last:
+                    self.busy[row, day, first:last] = True
+            current += timedelta(days=1)
+
+    def mark_busy_many(self, calendar_id: str, intervals: Iterable[tuple[datetime, datetime]]) -> None:
+        """
+        Mark many busy periods for a calendar in one vectorized pass.
+
+        Intervals are laid onto a round-the-clock timeline with a difference
+        array, then the business-hours columns of business days are kept.
+        """
+        intervals = list(intervals)
+        if not intervals:
+            return
+
+        step_seconds = int(self.granularity.total_seconds())
+        steps_per_full_day = 24 * 3600 // step_seconds
+        total_steps = self.days * steps_per_full_day
+        origin = np.datetime64(self.origin, 's')
+
+        starts = (np.array([s for s, _ in intervals], dtype='datetime64[s]') - origin).astype(np.int64)
+        ends = (np.array([e for _, e in intervals], dtype='datetime64[s]') - origin).astype(np.int64)
+        first = np.clip(starts // step_seconds, 0, total_steps)
+        last = np.clip(-(-ends // step_seconds), 0, total_steps)  # ceil
+        keep = first < last
+
+        delta = np.zeros(total_steps + 1, dtype=np.int32)
+        np.add.at(delta, first[keep], 1)
+        np.add.at(delta, last[keep], -1)
+        timeline = (np.cumsum(delta[:-1]) > 0).reshape(self.days, steps_per_full_day)
+
+        row = self._calendar_index[calendar_id]
+        columns = slice(self._first_step, self._first_step + self.busy.shape[2])
+        self.busy[row] |= timeline[self._day_offsets, columns]
+
+    # --------- Reductions ----------
+
+    def free_count(self) -> np.ndarray:
+        """Number of free calendars per (day, step)."""
+        return (~self.busy).sum(axis=0)
+
+    def all_free(self) -> np.ndarray:
+        """Steps where every calendar is free, shape (days, steps)."""
+        return ~self.busy.any(axis=0)
+
+    def any_free(self) -> np.ndarray:
+        """Steps where at least one calendar is free, shape (days, steps)."""
+        return ~self.busy.all(axis=0)
+
+    def window_free(self, duration_minutes: int) -> np.ndarray:
+        """
+        Whether each calendar is free for a whole window starting at each step.
+
+        Returns:
+            Boolean array of shape (calendars, days, start positions); windows
+            never cross into the next day
+        """
+        width = -(-duration_minutes // int(self.granularity.total_seconds() // 60))
+        steps = self.busy.shape[2]
+        if width > steps:
+            return np.zeros(self.busy.shape[:2] + (0,), dtype=bool)
+
+        # Sliding-window sum of free cells via cumulative sums
+        free = (~self.busy).astype(np.int32)
+        totals = np.zeros(free.shape[:2] + (steps + 1,), dtype=np.int32)
+        np.cumsum(free, axis=2, out=totals[:, :, 1:])
+        return (totals[:, :, width:] - totals[:, :, :-width]) == width
+
+    # --------- Search ----------
+
+    def find_slots(
+        self,
+        duration_minutes: int,
+        min_free: int = 1,
+        not_before: datetime | None = None,
+        limit: int = 1,
+    ) -> list[tuple[datetime, datetime, list[str]]]:
+        """
+        Find the earliest windows where at least `min_free` calendars are free.
+
+        Args:
+            duration_minutes: Length of the window
+            min_free: How many calendars must be free for the whole window
+            not_before: Ignore windows starting before this time
+            limit: Maximum number of windows to return
+
+        Returns:
+            List of (start, end, free calendar IDs), in chronological order
+        """
+        window_free = self.window_free(duration_minutes)
+        candidates = window_free.sum(axis=0) >= min_free
+
+        if not_before is not None:
+            for day in range(candidates.shape[0]):
+                cutoff = -int(-(not_before - self._day_start(day)).total_seconds() // self.granularity.total_seconds())
+                if cutoff <= 0:
+                    break
+                candidates[day, :cutoff] = False
+
+        results = []
+        duration = timedelta(minutes=duration_minutes)
+        for day, step in zip(*np.nonzero(candidates)):
+            if len(results) >= limit:
+                break
+            start = self._day_start(int(day)) + int(step) * self.granularity
+            free_calendars = [
+                self.calendar_ids[row]
+                for row in np.flatnonzero(window_free[:, day, step])
+            ]
+            results.append((start, start + duration, free_calendars))
+
+        return results
@@ -0,0 +1,240 @@
+"""
+In-process availability cache backed by Calendar incremental sync.
+
+Instead of listing every event in the window on each availability question,
+the cache keeps the busy periods of each calendar in memory and refreshes
+them with the Calendar API's syncToken/nextSyncToken, so only events that
+changed since the last sync are fetched. Computed slots are memoized per
+calendar and date window until the calendar changes.
+
+Bookings made through this process are written through immediately with
+add_event(), so they show up without waiting for the next sync.
+"""
+
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from core.metrics import metrics
+from services.busy_index import BusyIndex
+from services.calendar_events import SYNC_FIELDS, iter_event_pages, parse_event_times
+
+# --------- Configuration ----------
+CACHE_TTL_SECONDS = 60    # Serve from memory this long before an incremental sync
+SYNC_HORIZON_DAYS = 90    # How far ahead a full sync looks
+
+
+class _CalendarState:
+    """Synced busy periods of a single calendar."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events: dict[str, tuple[datetime, datetime]] = {}
+        self.index = BusyIndex()
+        self.sync_token: str | None = None
+        self.synced_at: float | None = None  # time.monotonic() of the last sync
+        self.window_start: datetime | None = None
+        self.window_end: datetime | None = None
+        self.version = 0
+        self.slots: dict[tuple[datetime, int], tuple[int, dict]] = {}
+
+    def put(self, event_id: str, interval: tuple[datetime, datetime]) -> None:
+        """Insert or update an event in both the event map and the index."""
+        old = self.events.get(event_id)
+        if old == interval:
+            return
+        if old is not None:
+            self.index.remove(*old)
+        self.events[event_id] = interval
+        self.index.add(*interval)
+
+    def discard(self, event_id: str) -> None:
+        """Remove an event from both the event map and the index."""
+        old = self.events.pop(event_id, None)
+        if old is not None:
+            self.index.remove(*old)
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        return (
+            self.window_start is not None
+            and self.window_start <= start
+            and end <= self.window_end
+        )
+
+
+class AvailabilityCache:
+    """
+    Busy-time cache keyed by calendar ID, with memoized slots per date window.
+
+    Safe to share between threads; each calendar syncs under its own lock so
+    concurrent questions about the same calendar trigger a single API call.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        horizon_days: int = SYNC_HORIZON_DAYS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.horizon_days = horizon_days
+        self._lock = threading.Lock()
+        self._calendars: dict[str, _CalendarState] = {}
+
+    def _state(self, calendar_id: str) -> _CalendarState:
+        with self._lock:
+            state = self._calendars.get(calendar_id)
+            if state is None:
+                state = self._calendars[calendar_id] = _CalendarState()
+            return state
+
+    # --------- Sync ----------
+
+    def _full_sync(self, service, calendar_id: str, state: _CalendarState, start: datetime, end: datetime) -> None:
+        """Reload every event in the sync horizon and remember the sync token."""
+        window_end = max(end, start + timedelta(days=self.horizon_days))
+        events: dict[str, tuple[datetime, datetime]] = {}
+        sync_token = None
+
+        metrics.inc("availability_sync_total", kind="full")
+        for page in iter_event_pages(
+            service,
+            calendarId=calendar_id,
+            timeMin=start.isoformat() + 'Z',
+            timeMax=window_end.isoformat() + 'Z',
+            singleEvents=True,
+            fields=SYNC_FIELDS,
+        ):
+            for event in page.get('items', []):
+                if event.get('status') != 'cancelled':
+                    events[event['id']] = parse_event_times(event)
+
+            # Only the last page carries the sync token
+            sync_token = page.get('nextSyncToken')
+
+        state.events = events
+        state.index = BusyIndex(events.values())
+        state.sync_token = sync_token
+        state.window_start = start
+        state.window_end = window_end
+        state.version += 1
+        state.slots.clear()
+
+    def _incremental_sync(self, service, calendar_id: str, state: _CalendarState) -> None:
+        """
+        Apply the changes since the last sync.
+
+        Raises:
+            HttpError: 410 if the sync token expired and a full sync is required
+        """
+        changed = False
+        sync_token = state.sync_token
+        metrics.inc("availability_sync_total", kind="incremental")
+
+        for page in iter_event_pages(
+            service,
+            calendarId=calendar_id,
+            singleEvents=True,
+            syncToken=state.sync_token,
+            fields=SYNC_FIELDS,
+        ):
+            for event in page.get('items', []):
+                changed = True
+                if event.get('status') == 'cancelled':
+                    state.discard(event['id'])
+                else:
+                    state.put(event['id'], parse_event_times(event))
+
+            sync_token = page.get('nextSyncToken', sync_token)
+
+        state.sync_token = sync_token
+
+        if changed:
+            state.version += 1
+            state.slots.clear()
+
+    def _refresh(self, service, calendar_id: str, state: _CalendarState, start: datetime, end: datetime) -> None:
+        """Bring a calendar up to date if its data is stale or does not cover the window."""
+        from googleapiclient.errors import HttpError
+
+        now = time.monotonic()
+        fresh = state.synced_at is not None and now - state.synced_at < self.ttl_seconds
+        if fresh and state.covers(start, end):
+            return
+
+        if state.sync_token and state.covers(start, end):
+            try:
+                self._incremental_sync(service, calendar_id, state)
+            except HttpError as e:
+                if e.resp.status != 410:  # 410 Gone: sync token expired
+                    raise
+                self._full_sync(service, calendar_id, state, start, end)
+        else:
+            self._full_sync(service, calendar_id, state, start, end)
+
+        state.synced_at = now
+
+    # --------- Reads ----------
+
+    def busy_times(self, service, calendar_id: str, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+        """Return the merged busy periods overlapping [start, end), sorted by start time."""
+        state = self._state(calendar_id)
+        with state.lock:
+            self._refresh(service, calendar_id, state, start, end)
+            return state.index.overlapping(start, end)
+
+    def available_slots(
+        self,
+        service,
+        calendar_id: str,
+        start_date: datetime,
+        days: int,
+        calculate,
+    ) -> dict[date, list[tuple[datetime, datetime]]]:
+        """
+        Return the available slots for a date window, memoized until the calendar changes.
+
+        Args:
+            service: Google Calendar API service
+            calendar_id: Calendar to check
+            start_date: Start date to check availability
+            days: Number of days to check
+            calculate: Function (busy_index, start_date, days) -> available slots
+        """
+        end_date = start_date + timedelta(days=days)
+        state = self._state(calendar_id)
+        with state.lock:
+            self._refresh(service, calendar_id, state, start_date, end_date)
+
+            key = (start_date, days)
+            cached = state.slots.get(key)
+            if cached is not None and cached[0] == state.version:
+                metrics.inc("availability_cache_total", result="hit")
+                return cached[1]
+            metrics.inc("availability_cache_total", result="miss")
+
+            slots = calculate(state.index, start_date, days)
+            state.slots[key] = (state.version, slots)
+            return slots
+
+    # --------- Writes ----------
+
+    def add_event(self, calendar_id: str, event: dict) -> None:
+        """Write a newly created event through to the cache."""
+        state = self._state(calendar_id)
+        with state.lock:
+            if state.window_start is None:
+                return  # Nothing cached yet, the next read does a full sync
+            state.put(event['id'], parse_event_times(event))
+            state.version += 1
+            state.slots.clear()
+
+    def invalidate(self, calendar_id: str | None = None) -> None:
+        """Forget cached data for one calendar, or for all of them."""
+        with self._lock:
+            if calendar_id is None:
+                self._calendars.clear()
+            else:
+                self._calendars.pop(calendar_id, None)
+
+
+availability_cache = AvailabilityCache()
@@ -0,0 +1,119 @@
+"""
+Sorted interval index for busy periods.
+
+Busy periods are merged once into a sorted list of disjoint intervals, so
+free-time questions are answered with a binary search instead of a scan over
+every event. Bookings can be added and removed as they arrive.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Iterable, Iterator
+
+Interval = tuple[datetime, datetime]
+
+
+class BusyIndex:
+    """
+    Index of busy intervals supporting "free gaps in [a, b)" queries.
+
+    The raw intervals are kept as a sorted multiset so that a single event can
+    be removed again; the merged view is updated in place on add() and rebuilt
+    lazily after remove().
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self._raw: list[Interval] = sorted((s, e) for s, e in intervals if s < e)
+        self._starts: list[datetime] = []
+        self._ends: list[datetime] = []
+        self._dirty = True
+
+    def __len__(self) -> int:
+        """Number of busy intervals added (before merging)."""
+        return len(self._raw)
+
+    def __iter__(self) -> Iterator[Interval]:
+        """Iterate over the merged, disjoint busy intervals in start order."""
+        self._merge()
+        return zip(self._starts, self._ends)
+
+    # --------- Maintenance ----------
+
+    def _merge(self) -> None:
+        """Rebuild the merged view from the raw intervals if it is stale."""
+        if not self._dirty:
+            return
+
+        starts: list[datetime] = []
+        ends: list[datetime] = []
+        for start, end in self._raw:
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+
+        self._starts, self._ends = starts, ends
+        self._dirty = False
+
+    def add(self, start: datetime, end: datetime) -> None:
+        """Mark [start, end) as busy."""
+        if start >= end:
+            return
+
+        insort(self._raw, (start, end))
+        if self._dirty:
+            return
+
+        # Merge into the disjoint view: replace every interval touching
+        # [start, end) with their union
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def remove(self, start: datetime, end: datetime) -> bool:
+        """
+        Remove one busy interval previously added with the same bounds.
+
+        Returns:
+            True if the interval was found and removed
+        """
+        i = bisect_left(self._raw, (start, end))
+        if i < len(self._raw) and self._raw[i] == (start, end):
+            del self._raw[i]
+            self._dirty = True
+            return True
+        return False
+
+    # --------- Queries ----------
+
+    def overlapping(self, start: datetime, end: datetime) -> list[Interval]:
+        """Return the merged busy intervals overlapping [start, end)."""
+        self._merge()
+        i = bisect_right(self._ends, start)
+        j = bisect_left(self._starts, end)
+        return list(zip(self._starts[i:j], self._ends[i:j]))
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        """Whether [start, end) does not overlap any busy interval."""
+        self._merge()
+        i = bisect_right(self._ends, start)
+        return i >= len(self._starts) or self._starts[i] >= end
+
+    def free_gaps(self, start: datetime, end: datetime) -> list[Interval]:
+        """Return the free intervals inside [start, end), in order."""
+        gaps = []
+        current = start
+        for busy_start, busy_end in self.overlapping(start, end):
+            if busy_start > current:
+                gaps.append((current, busy_start))
+            current = max(current, busy_end)
+
+        if current < end:
+            gaps.append((current, end))
+
+        return gaps
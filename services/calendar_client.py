@@ -0,0 +1,202 @@
+"""
+Long-lived Google Calendar client shared by the whole process.
+
+Building the Calendar service means reading token.json, possibly refreshing
+credentials and loading the discovery document. This module does that once
+and keeps the result around:
+
+- Credentials are refreshed in place shortly before they expire
+- A single lock serializes refreshes so token.json is never written concurrently
+- Every worker thread gets its own HTTP transport (httplib2 is not thread-safe)
+- The service is built from the discovery document bundled with
+  google-api-python-client, so building it needs no network round trip
+
+The Google client libraries are imported on first use rather than at import
+time, so processes that never touch the calendar (or have not yet) start fast.
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import google_auth_httplib2
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.http import HttpRequest
+
+# --------- Configuration ----------
+TOKEN_PATH = 'token.json'
+CREDENTIALS_PATH = 'credentials.json'
+REFRESH_MARGIN = timedelta(minutes=5)  # Refresh this long before expiry
+
+
+class CalendarClient:
+    """
+    Process-wide holder for the Calendar service and its credentials.
+
+    The service object is built once. Requests created from it are bound to a
+    per-thread authorized HTTP transport, so the same service can be used from
+    any number of worker threads.
+    """
+
+    def __init__(
+        self,
+        scopes: list[str],
+        token_path: str = TOKEN_PATH,
+        credentials_path: str = CREDENTIALS_PATH,
+        refresh_margin: timedelta = REFRESH_MARGIN,
+    ):
+        self.scopes = scopes
+        self.token_path = token_path
+        self.credentials_path = credentials_path
+        self.refresh_margin = refresh_margin
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._creds: 'Credentials | None' = None
+        self._service = None
+
+    # --------- Credentials ----------
+
+    def _load_credentials(self) -> 'Credentials':
+        """
+        Load credentials from token.json, running the OAuth flow if needed.
+
+        Must be called with the lock held.
+
+        Raises:
+            FileNotFoundError: If credentials.json is not found
+        """
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
+        creds = None
+
+        # Check if token.json exists (previous authorization)
+        if os.path.exists(self.token_path):
+            creds = Credentials.from_authorized_user_file(self.token_path, self.scopes)
+
+        # If no valid credentials, start OAuth flow
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    self.credentials_path, self.scopes
+                )
+                creds = flow.run_local_server(port=0)
+
+            self._save_credentials(creds)
+
+        return creds
+
+    def _save_credentials(self, creds: 'Credentials') -> None:
+        """Persist credentials for the next run. Must be called with the lock held."""
+        with open(self.token_path, 'w') as token:
+            token.write(creds.to_json())
+
+    def _needs_refresh(self) -> bool:
+        """Whether the credentials are missing, invalid or about to expire."""
+        creds = self._creds
+        if creds is None or not creds.valid:
+            return True
+        if creds.expiry is None:
+            return False
+        # google-auth stores expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return creds.expiry - self.refresh_margin <= now
+
+    def ensure_fresh(self) -> 'Credentials':
+        """
+        Return credentials that are valid for at least `refresh_margin`.
+
+        Refreshes happen in place under the lock, so every thread keeps using
+        the same credentials object and token.json is written at most once.
+        """
+        if not self._needs_refresh():
+            return self._creds
+
+        with self._lock:
+            # Another thread may have refreshed while we were waiting
+            if not self._needs_refresh():
+                return self._creds
+
+            if self._creds is None:
+                self._creds = self._load_credentials()
+            elif self._creds.refresh_token:
+                from google.auth.transport.requests import Request
+
+                self._creds.refresh(Request())
+                self._save_credentials(self._creds)
+            else:
+                self._creds = self._load_credentials()
+
+            return self._creds
+
+    # --------- Transport ----------
+
+    def http(self) -> 'google_auth_httplib2.AuthorizedHttp':
+        """Return the authorized HTTP transport owned by the calling thread."""
+        authed_http = getattr(self._local, 'http', None)
+        if authed_http is None:
+            import google_auth_httplib2
+            import httplib2
+
+            authed_http = google_auth_httplib2.AuthorizedHttp(
+                self.ensure_fresh(), http=httplib2.Http()
+            )
+            self._local.http = authed_http
+        return authed_http
+
+    def _build_request(self, http, *args, **kwargs) -> 'HttpRequest':
+        """Request builder that ignores the shared transport and uses the thread's own."""
+        from googleapiclient.http import HttpRequest
+
+        self.ensure_fresh()
+        return HttpRequest(self.http(), *args, **kwargs)
+
+    # --------- Service ----------
+
+    @property
+    def service(self):
+        """The Calendar API service, built on first use."""
+        if self._service is None:
+            import google_auth_httplib2
+            import httplib2
+            from googleapiclient.discovery import build
+
+            creds = self.ensure_fresh()
+            with self._lock:
+                if self._service is None:
+                    self._service = build(
+                        'calendar',
+                        'v3',
+                        http=google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http()),
+                        requestBuilder=self._build_request,
+                        static_discovery=True,  # Bundled discovery document, no fetch
+                        cache_discovery=False,
+                    )
+        return self._service
+
+    def reset(self) -> None:
+        """Drop the cached service and credentials, e.g. after token.json changes."""
+        with self._lock:
+            self._creds = None
+            self._service = None
+            self._local = threading.local()
+
+
+_client: CalendarClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_calendar_client(scopes: list[str]) -> CalendarClient:
+    """Return the process-wide CalendarClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = CalendarClient(scopes)
+    return _client
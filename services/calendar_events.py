@@ -0,0 +1,77 @@
+"""
+Helpers for reading events from the Google Calendar API.
+
+events().list is paginated; these generators follow nextPageToken lazily so
+callers never hold more than one page in memory, and request only the
+fields they need via `fields=`.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+
+from core.metrics import metrics
+
+# --------- Configuration ----------
+PAGE_SIZE = 250  # Events per page (API default is 250, max 2500)
+BUSY_FIELDS = 'nextPageToken,items(start,end)'
+SYNC_FIELDS = 'nextPageToken,nextSyncToken,items(id,status,start,end)'
+
+
+def parse_event_times(event: dict) -> tuple[datetime, datetime]:
+    """
+    Return the (start, end) of a Calendar event as naive datetimes.
+
+    Timed events keep their wall-clock time; all-day events span midnight
+    to midnight.
+    """
+    start = event['start'].get('dateTime', event['start'].get('date'))
+    end = event['end'].get('dateTime', event['end'].get('date'))
+
+    # Parse datetime strings
+    if 'T' in start:  # DateTime format
+        start_dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
+        end_dt = datetime.fromisoformat(end.replace('Z', '+00:00'))
+        # Convert to naive datetime for comparison
+        start_dt = start_dt.replace(tzinfo=None)
+        end_dt = end_dt.replace(tzinfo=None)
+    else:  # All-day event
+        start_dt = datetime.strptime(start, '%Y-%m-%d')
+        end_dt = datetime.strptime(end, '%Y-%m-%d')
+
+    return start_dt, end_dt
+
+
+@contextmanager
+def api_call(method: str):
+    """Count and time one Calendar API round trip (calendar_api_* metrics)."""
+    metrics.inc("calendar_api_calls_total", method=method)
+    with metrics.timer("calendar_api_seconds", method=method):
+        yield
+
+
+def iter_event_pages(service, **params) -> Iterator[dict]:
+    """
+    Yield each page of an events().list query, following nextPageToken.
+
+    Args:
+        service: Google Calendar API service
+        **params: Parameters for events().list (calendarId, fields, ...)
+    """
+    params.setdefault('maxResults', PAGE_SIZE)
+    page_token = None
+
+    while True:
+        with api_call('events.list'):
+            page = service.events().list(pageToken=page_token, **params).execute()
+        yield page
+
+        page_token = page.get('nextPageToken')
+        if not page_token:
+            return
+
+
+def iter_events(service, **params) -> Iterator[dict]:
+    """Yield every event of an events().list query, one page at a time."""
+    for page in iter_event_pages(service, **params):
+        yield from page.get('items', [])
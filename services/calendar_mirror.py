@@ -0,0 +1,336 @@
+"""
+Local SQLite mirror of Google Calendar events.
+
+Availability questions are answered from a table of busy periods indexed by
+(calendar_id, start_time, end_time) instead of the Calendar API, so read latency and
+API quota no longer scale with chat volume. The mirror is kept current by a
+periodic incremental sync (syncToken/nextSyncToken), falling back to a full
+reload of the sync horizon when the token expires. A mirror that has not
+synced recently is not trusted: covers() reports it as stale so callers
+sync before reading.
+
+Bookings are written through: once the Calendar API has accepted an insert,
+the event is stored in the mirror in the same call. If that local write ever
+fails, the next incremental sync brings the event in under the same ID, so
+the two always reconcile.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from core.metrics import metrics
+from services.calendar_events import SYNC_FIELDS, iter_event_pages, parse_event_times
+
+import logging
+logger = logging.getLogger(__name__)
+
+# --------- Configuration ----------
+SYNC_HORIZON_DAYS = 90       # How far ahead a full sync mirrors
+MAX_STALENESS_SECONDS = 300  # Older mirrors are synced before they are read
+
+
+def _ts(dt: datetime) -> str:
+    """Fixed-width ISO timestamp, so string order is time order in SQLite."""
+    return dt.isoformat(timespec='seconds')
+
+
+class CalendarMirror:
+    """SQLite copy of the busy periods of one or more calendars."""
+
+    def __init__(
+        self,
+        db_path: str,
+        horizon_days: int = SYNC_HORIZON_DAYS,
+        max_staleness_seconds: float = MAX_STALENESS_SECONDS,
+    ):
+        """
+        Args:
+            db_path: SQLite file for the mirror (':memory:' for a private copy)
+            horizon_days: Days ahead of today that a sync keeps mirrored
+            max_staleness_seconds: How long after a sync the mirror is trusted
+        """
+        self.db_path = db_path
+        self.horizon_days = horizon_days
+        self.max_staleness_seconds = max_staleness_seconds
+        self._lock = threading.Lock()  # Guards the connection and memo
+        self._sync_locks: dict[str, threading.Lock] = {}
+        self._versions: dict[str, int] = {}
+        self._slots: dict[tuple[str, datetime, int], tuple[int, dict]] = {}
+        self._recorded: dict[str, list[tuple]] = {}  # Write-throughs during a full sync, per calendar
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS mirror_events (
+                calendar_id TEXT NOT NULL,
+                event_id TEXT NOT NULL,
+                start_time TEXT NOT NULL,
+                end_time TEXT NOT NULL,
+                PRIMARY KEY (calendar_id, event_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_mirror_events_range
+                ON mirror_events (calendar_id, start_time, end_time);
+            CREATE TABLE IF NOT EXISTS mirror_sync_state (
+                calendar_id TEXT PRIMARY KEY,
+                sync_token TEXT,
+                window_start TEXT NOT NULL,
+                window_end TEXT NOT NULL,
+                synced_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def _sync_lock(self, calendar_id: str) -> threading.Lock:
+        with self._lock:
+            return self._sync_locks.setdefault(calendar_id, threading.Lock())
+
+    def _changed(self, calendar_id: str) -> None:
+        """Invalidate memoized slots of a calendar. Must be called with the lock held."""
+        self._versions[calendar_id] = self._versions.get(calendar_id, 0) + 1
+        for key in [key for key in self._slots if key[0] == calendar_id]:
+            del self._slots[key]
+
+    # --------- Sync ----------
+
+    def sync_state(self, calendar_id: str) -> dict | None:
+        """Return the sync token, window and time of the last sync, or None if never synced."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sync_token, window_start, window_end, synced_at FROM mirror_sync_state WHERE calendar_id = ?",
+                (calendar_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        sync_token, window_start, window_end, synced_at = row
+        return {
+            'sync_token': sync_token,
+            'window_start': datetime.fromisoformat(window_start),
+            'window_end': datetime.fromisoformat(window_end),
+            'synced_at': synced_at,
+        }
+
+    def covers(self, calendar_id: str, start: datetime, end: datetime) -> bool:
+        """
+        Whether the mirror holds every event of a calendar in [start, end)
+        and was synced within max_staleness_seconds.
+        """
+        state = self.sync_state(calendar_id)
+        return (
+            state is not None
+            and state['window_start'] <= start
+            and end <= state['window_end']
+            and time.time() - state['synced_at'] <= self.max_staleness_seconds
+        )
+
+    def sync(self, service, calendar_id: str, start: datetime | None = None, end: datetime | None = None) -> None:
+        """
+        Bring a calendar up to date: incrementally when possible, otherwise by
+        reloading the window (at least today through the sync horizon).
+
+        The window moves forward with the horizon: an incremental sync also
+        loads the days between the old window end and the new one.
+
+        Args:
+            service: Google Calendar API service
+            calendar_id: Calendar to sync
+            start: Earliest time that must be mirrored (default: today)
+            end: Latest time that must be mirrored (default: the sync horizon)
+        """
+        from googleapiclient.errors import HttpError
+
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = min(start or today, today)
+        end = max(end or today, today + timedelta(days=self.horizon_days))
+
+        with self._sync_lock(calendar_id):
+            state = self.sync_state(calendar_id)
+            if state and state['sync_token'] and state['window_start'] <= start:
+                try:
+                    self._incremental_sync(service, calendar_id, state['sync_token'])
+                    if end > state['window_end']:
+                        self._extend_window(service, calendar_id, state['window_end'], end)
+                    return
+                except HttpError as e:
+                    if e.resp.status != 410:  # 410 Gone: sync token expired
+                        raise
+                    logger.info("Sync token expired for %s, reloading the mirror", calendar_id)
+            self._full_sync(service, calendar_id, start, end)
+
+    def _full_sync(self, service, calendar_id: str, start: datetime, end: datetime) -> None:
+        """
+        Reload a calendar's events in [start, end).
+
+        Events written through with record_event() while the reload is being
+        fetched may be missing from the fetched snapshot, so they are
+        re-applied before the snapshot replaces the old rows.
+        """
+        metrics.inc("calendar_mirror_sync_total", kind="full")
+        with self._lock:
+            self._recorded[calendar_id] = []
+        rows, sync_token = [], None
+        try:
+            for page in iter_event_pages(
+                service,
+                calendarId=calendar_id,
+                timeMin=start.isoformat() + 'Z',
+                timeMax=end.isoformat() + 'Z',
+                singleEvents=True,
+                fields=SYNC_FIELDS,
+            ):
+                for event in page.get('items', []):
+                    if event.get('status') != 'cancelled':
+                        event_start, event_end = parse_event_times(event)
+                        rows.append((calendar_id, event['id'], _ts(event_start), _ts(event_end)))
+                sync_token = page.get('nextSyncToken', sync_token)
+        except BaseException:
+            with self._lock:
+                self._recorded.pop(calendar_id, None)
+            raise
+
+        with self._lock, self._conn:
+            rows.extend(self._recorded.pop(calendar_id, []))
+            self._conn.execute("DELETE FROM mirror_events WHERE calendar_id = ?", (calendar_id,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO mirror_events (calendar_id, event_id, start_time, end_time) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO mirror_sync_state VALUES (?, ?, ?, ?, ?)",
+                (calendar_id, sync_token, _ts(start), _ts(end), time.time()),
+            )
+            self._changed(calendar_id)
+
+    def _incremental_sync(self, service, calendar_id: str, sync_token: str) -> None:
+        """
+        Apply the changes since the last sync.
+
+        Raises:
+            HttpError: 410 if the sync token expired and a full sync is required
+        """
+        metrics.inc("calendar_mirror_sync_total", kind="incremental")
+        upserts, deletes = [], []
+        for page in iter_event_pages(
+            service,
+            calendarId=calendar_id,
+            singleEvents=True,
+            syncToken=sync_token,
+            fields=SYNC_FIELDS,
+        ):
+            for event in page.get('items', []):
+                if event.get('status') == 'cancelled':
+                    deletes.append((calendar_id, event['id']))
+                else:
+                    event_start, event_end = parse_event_times(event)
+                    upserts.append((calendar_id, event['id'], _ts(event_start), _ts(event_end)))
+            sync_token = page.get('nextSyncToken', sync_token)
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM mirror_events WHERE calendar_id = ? AND event_id = ?", deletes
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO mirror_events (calendar_id, event_id, start_time, end_time) VALUES (?, ?, ?, ?)",
+                upserts,
+            )
+            self._conn.execute(
+                "UPDATE mirror_sync_state SET sync_token = ?, synced_at = ? WHERE calendar_id = ?",
+                (sync_token, time.time(), calendar_id),
+            )
+            if upserts or deletes:
+                self._changed(calendar_id)
+
+    def _extend_window(self, service, calendar_id: str, window_end: datetime, end: datetime) -> None:
+        """
+        Load the events in [window_end, end), which the sync token does not
+        cover, and move the end of the mirrored window to `end`.
+        """
+        metrics.inc("calendar_mirror_sync_total", kind="extend")
+        rows = []
+        for page in iter_event_pages(
+            service,
+            calendarId=calendar_id,
+            timeMin=window_end.isoformat() + 'Z',
+            timeMax=end.isoformat() + 'Z',
+            singleEvents=True,
+            fields=SYNC_FIELDS,
+        ):
+            for event in page.get('items', []):
+                if event.get('status') != 'cancelled':
+                    event_start, event_end = parse_event_times(event)
+                    rows.append((calendar_id, event['id'], _ts(event_start), _ts(event_end)))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO mirror_events (calendar_id, event_id, start_time, end_time) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "UPDATE mirror_sync_state SET window_end = ? WHERE calendar_id = ?",
+                (_ts(end), calendar_id),
+            )
+            if rows:
+                self._changed(calendar_id)
+
+    # --------- Reads ----------
+
+    def busy_times(self, calendar_id: str, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+        """Return the busy periods overlapping [start, end), sorted by start time. Never calls the API."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT start_time, end_time FROM mirror_events
+                WHERE calendar_id = ? AND start_time < ? AND end_time > ?
+                ORDER BY start_time
+                """,
+                (calendar_id, _ts(end), _ts(start)),
+            ).fetchall()
+        return [(datetime.fromisoformat(row_start), datetime.fromisoformat(row_end)) for row_start, row_end in rows]
+
+    def available_slots(self, calendar_id: str, start_date: datetime, days: int, calculate) -> dict[date, list[tuple[datetime, datetime]]]:
+        """
+        Return the available slots for a date window, memoized until the mirror changes.
+
+        Args:
+            calendar_id: Calendar to check
+            start_date: Start date to check availability
+            days: Number of days to check
+            calculate: Function (busy_times, start_date, days) -> available slots
+        """
+        key = (calendar_id, start_date, days)
+        with self._lock:
+            version = self._versions.get(calendar_id, 0)
+            cached = self._slots.get(key)
+        if cached is not None and cached[0] == version:
+            metrics.inc("availability_cache_total", result="hit")
+            return cached[1]
+        metrics.inc("availability_cache_total", result="miss")
+
+        slots = calculate(self.busy_times(calendar_id, start_date, start_date + timedelta(days=days)), start_date, days)
+        with self._lock:
+            if self._versions.get(calendar_id, 0) == version:
+                self._slots[key] = (version, slots)
+        return slots
+
+    # --------- Writes ----------
+
+    def record_event(self, calendar_id: str, event: dict) -> None:
+        """Write an event the Calendar API just accepted through to the mirror."""
+        event_start, event_end = parse_event_times(event)
+        row = (calendar_id, event['id'], _ts(event_start), _ts(event_end))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO mirror_events (calendar_id, event_id, start_time, end_time) VALUES (?, ?, ?, ?)",
+                row,
+            )
+            if calendar_id in self._recorded:
+                self._recorded[calendar_id].append(row)  # A full sync is fetching; keep the event through it
+            self._changed(calendar_id)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
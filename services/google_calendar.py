@@ -5,27 +5,64 @@ This module provides functions to:
 - Authenticate with Google Calendar API
 - Check available time slots
 - Create calendar events for bookings
+
+By default availability is answered from a local SQLite mirror of the
+calendar (services.calendar_mirror), kept current by run_calendar_sync() in
+the background, so availability checks make no Calendar API calls.
 """
 
+import asyncio
+import functools
+import json
 import os
-from datetime import datetime, timedelta
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Iterator
+
+from core.metrics import metrics
+from services.availability_cache import availability_cache
+from services.busy_index import BusyIndex
+from services.calendar_client import get_calendar_client
+from services.calendar_events import BUSY_FIELDS, api_call, iter_events, parse_event_times
+from services.calendar_mirror import CalendarMirror
+from services.slot_leases import slot_leases
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+import logging
+logger = logging.getLogger(__name__)
 
 # --------- Configuration ----------
-SCOPES = ['https://www.googleapis.com/auth/calendar.events']
+SCOPES = [
+    'https://www.googleapis.com/auth/calendar.events',
+    'https://www.googleapis.com/auth/calendar.freebusy',  # Multi-calendar availability
+]
 BUSINESS_HOURS_START = 9   # 9 AM
 BUSINESS_HOURS_END = 17    # 5 PM
 TIMEZONE = 'Asia/Manila'
 DAYS_TO_CHECK = 7  # Check availability for next 7 days
+TIME_OF_DAY_HOURS = {  # Preferred time of day for availability searches
+    'morning': (BUSINESS_HOURS_START, 12),
+    'afternoon': (12, BUSINESS_HOURS_END),
+}
+CALENDAR_IO_WORKERS = 8  # Max concurrent blocking Calendar API calls for the async API
+AVAILABILITY_BACKEND = 'mirror'  # 'mirror' (SQLite), 'cache' (in-memory sync), 'events' (streamed) or 'freebusy'
+CALENDAR_MIRROR_PATH = os.environ.get("CALENDAR_MIRROR_PATH", "calendar_mirror.db")
+MIRROR_SYNC_INTERVAL_SECONDS = 60  # Background incremental sync of the mirror
+FREEBUSY_MAX_CALENDARS = 50  # Calendars per freebusy().query request (API limit)
+FREEBUSY_MAX_DAYS = 60  # Days per freebusy().query request
+BATCH_MAX_REQUESTS = 50  # Requests per HTTP batch (Calendar API limit)
+
+
+class SlotUnavailableError(ValueError):
+    """Raised when a requested slot is already booked or held by another conversation."""
 
 
 def get_calendar_service():
     """
-    Create and return an authorized Google Calendar API service.
+    Return the authorized Google Calendar API service.
+    
+    The service is built once per process and shared; see
+    services.calendar_client.CalendarClient for refresh and threading details.
     
     Returns:
         Google Calendar API service object
@@ -33,92 +70,201 @@ def get_calendar_service():
     Raises:
         FileNotFoundError: If credentials.json is not found
     """
-    creds = None
-    
-    # Check if token.json exists (previous authorization)
-    if os.path.exists('token.json'):
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-    
-    # If no valid credentials, start OAuth flow
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(
-                'credentials.json', SCOPES
-            )
-            creds = flow.run_local_server(port=0)
-        
-        # Save credentials for next run
-        with open('token.json', 'w') as token:
-            token.write(creds.to_json())
+    with metrics.timer("calendar_auth_seconds"):
+        return get_calendar_client(SCOPES).service
+
+
+# --------- Calendar Mirror ----------
+
+_mirror: CalendarMirror | None = None
+
+
+def get_calendar_mirror() -> CalendarMirror:
+    """Return the process-wide calendar mirror, opening it on first use."""
+    global _mirror
+    if _mirror is None:
+        _mirror = CalendarMirror(CALENDAR_MIRROR_PATH)
+    return _mirror
+
+
+def set_calendar_mirror(mirror: CalendarMirror) -> None:
+    """Replace the process-wide calendar mirror (e.g. with an in-memory one)."""
+    global _mirror
+    _mirror = mirror
+
+
+def sync_calendar_mirror(calendar_id: str = 'primary') -> None:
+    """
+    Bring the mirror of a calendar up to date with Google Calendar.
     
-    # Build and return the service
-    service = build('calendar', 'v3', credentials=creds)
-    return service
+    Raises:
+        FileNotFoundError: If credentials.json is not found
+        Exception: For calendar API errors
+    """
+    get_calendar_mirror().sync(get_calendar_service(), calendar_id)
+
+
+async def run_calendar_sync(interval: float = MIRROR_SYNC_INTERVAL_SECONDS) -> None:
+    """Sync the calendar mirror now and every `interval` seconds until cancelled."""
+    while True:
+        try:
+            await _run_blocking(sync_calendar_mirror)
+        except Exception:
+            logger.exception("Calendar mirror sync failed")
+        await asyncio.sleep(interval)
+
 
+def _covering_mirror(service, start: datetime, end: datetime) -> CalendarMirror:
+    """Return the mirror, syncing it first only if it does not hold [start, end) yet."""
+    mirror = get_calendar_mirror()
+    if not mirror.covers('primary', start, end):
+        mirror.sync(service, 'primary', start, end)  # Cold start or window beyond the horizon
+    return mirror
 
-def _get_busy_times(service, start_date: datetime, end_date: datetime) -> list[tuple[datetime, datetime]]:
+
+def _busy_snapshot(service, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """Busy periods of the primary calendar from the configured local store."""
+    if AVAILABILITY_BACKEND == 'mirror':
+        return _covering_mirror(service, start, end).busy_times('primary', start, end)
+    return availability_cache.busy_times(service, 'primary', start, end)
+
+
+def _write_through(event: dict) -> None:
+    """Make an event Google just accepted visible to availability checks immediately."""
+    if AVAILABILITY_BACKEND == 'mirror':
+        try:
+            get_calendar_mirror().record_event('primary', event)
+        except sqlite3.Error:
+            # The event exists in Google; the next sync brings it into the mirror
+            logger.exception("Could not write event %s to the calendar mirror", event.get('id'))
+    else:
+        availability_cache.add_event('primary', event)
+
+
+def _get_busy_times(
+    service,
+    start_date: datetime,
+    end_date: datetime,
+    calendar_id: str = 'primary'
+) -> Iterator[tuple[datetime, datetime]]:
     """
-    Fetch all events from the calendar and return busy time periods.
+    Stream busy time periods from the calendar, ordered by start time.
+    
+    Pages are fetched lazily as the caller consumes the stream and only the
+    start/end fields are requested, so memory stays flat regardless of how
+    many events fall in the range.
     
     Args:
         service: Google Calendar API service
         start_date: Start of the time range to check
         end_date: End of the time range to check
+        calendar_id: Calendar to read (default: 'primary')
     
-    Returns:
-        List of tuples containing (start_time, end_time) for each busy period
+    Yields:
+        (start_time, end_time) for each busy period
     """
-    events_result = service.events().list(
-        calendarId='primary',
+    for event in iter_events(
+        service,
+        calendarId=calendar_id,
         timeMin=start_date.isoformat() + 'Z',
         timeMax=end_date.isoformat() + 'Z',
         singleEvents=True,
-        orderBy='startTime'
-    ).execute()
+        orderBy='startTime',
+        fields=BUSY_FIELDS,
+    ):
+        yield parse_event_times(event)
+
+
+def _get_busy_times_freebusy(
+    service,
+    calendar_ids: list[str],
+    start_date: datetime,
+    end_date: datetime
+) -> dict[str, list[tuple[datetime, datetime]]]:
+    """
+    Fetch busy periods for many calendars with the FreeBusy endpoint.
     
-    events = events_result.get('items', [])
-    busy_times = []
+    Only start/end pairs come back, instead of full event bodies. Calendars
+    are batched up to FREEBUSY_MAX_CALENDARS per request and long ranges are
+    split into FREEBUSY_MAX_DAYS chunks.
     
-    for event in events:
-        start = event['start'].get('dateTime', event['start'].get('date'))
-        end = event['end'].get('dateTime', event['end'].get('date'))
+    Args:
+        service: Google Calendar API service
+        calendar_ids: Calendars to check
+        start_date: Start of the time range to check
+        end_date: End of the time range to check
+    
+    Returns:
+        Dictionary mapping each calendar ID to its (start_time, end_time) busy periods
         
-        # Parse datetime strings
-        if 'T' in start:  # DateTime format
-            start_dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
-            end_dt = datetime.fromisoformat(end.replace('Z', '+00:00'))
-            # Convert to naive datetime for comparison
-            start_dt = start_dt.replace(tzinfo=None)
-            end_dt = end_dt.replace(tzinfo=None)
-        else:  # All-day event
-            start_dt = datetime.strptime(start, '%Y-%m-%d')
-            end_dt = datetime.strptime(end, '%Y-%m-%d')
+    Raises:
+        ValueError: If the API reports an error for one of the calendars
+    """
+    busy_by_calendar = {calendar_id: [] for calendar_id in calendar_ids}
+    
+    for first in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS):
+        chunk = calendar_ids[first:first + FREEBUSY_MAX_CALENDARS]
         
-        busy_times.append((start_dt, end_dt))
+        range_start = start_date
+        while range_start < end_date:
+            range_end = min(range_start + timedelta(days=FREEBUSY_MAX_DAYS), end_date)
+            
+            with api_call('freebusy.query'):
+                response = service.freebusy().query(body={
+                    'timeMin': range_start.isoformat() + 'Z',
+                    'timeMax': range_end.isoformat() + 'Z',
+                    'timeZone': TIMEZONE,
+                    'items': [{'id': calendar_id} for calendar_id in chunk],
+                }).execute()
+            
+            for calendar_id, result in response.get('calendars', {}).items():
+                if result.get('errors'):
+                    reason = result['errors'][0].get('reason', 'unknown')
+                    raise ValueError(f"Free/busy lookup failed for calendar {calendar_id}: {reason}")
+                
+                for period in result.get('busy', []):
+                    # Periods are in TIMEZONE; keep the wall-clock time like events do
+                    busy_by_calendar[calendar_id].append((
+                        datetime.fromisoformat(period['start'].replace('Z', '+00:00')).replace(tzinfo=None),
+                        datetime.fromisoformat(period['end'].replace('Z', '+00:00')).replace(tzinfo=None),
+                    ))
+            
+            range_start = range_end
     
-    return busy_times
+    return busy_by_calendar
 
 
+@metrics.timed("slot_calculation_seconds")
 def _calculate_available_slots(
-    busy_times: list[tuple[datetime, datetime]], 
+    busy_times: Iterable[tuple[datetime, datetime]] | BusyIndex, 
     start_date: datetime, 
     days: int
-) -> dict[str, list[str]]:
+) -> dict[date, list[tuple[datetime, datetime]]]:
     """
     Calculate available time slots based on business hours and busy periods.
     
+    Busy periods are consumed in a single pass, so a lazy stream (such as
+    _get_busy_times()) is never materialized. Events spanning several days
+    are clamped to each day they cover.
+    
     Args:
-        busy_times: List of (start, end) tuples for busy periods
+        busy_times: (start, end) busy periods sorted by start time, a list in
+            any order, or a BusyIndex
         start_date: Start date to check availability
         days: Number of days to check
     
     Returns:
-        Dictionary mapping date strings to lists of available time slots
+        Dictionary mapping each date to its free (start, end) ranges, merged
+        and in order
     """
-    available_slots = {}
+    end_date = start_date + timedelta(days=days)
+    if isinstance(busy_times, BusyIndex):
+        busy_times = busy_times.overlapping(start_date, end_date)
+    elif isinstance(busy_times, list):
+        busy_times = sorted(busy_times)
     
+    # Business-hours windows of each weekday in the range
+    windows = []
     for day_offset in range(days):
         current_date = start_date + timedelta(days=day_offset)
         
@@ -126,91 +272,305 @@ def _calculate_available_slots(
         if current_date.weekday() >= 5:
             continue
         
-        date_str = current_date.strftime('%A, %B %d')
-        day_start = current_date.replace(hour=BUSINESS_HOURS_START, minute=0, second=0, microsecond=0)
-        day_end = current_date.replace(hour=BUSINESS_HOURS_END, minute=0, second=0, microsecond=0)
-        
-        # Get busy times for this day
-        day_busy = [(s, e) for s, e in busy_times 
-                    if s.date() == current_date.date() or e.date() == current_date.date()]
-        
-        # Sort by start time
-        day_busy.sort(key=lambda x: x[0])
-        
-        # Find available slots
-        slots = []
-        current_time = day_start
-        
-        for busy_start, busy_end in day_busy:
-            # Clamp busy times to business hours
-            busy_start = max(busy_start, day_start)
-            busy_end = min(busy_end, day_end)
-            
-            if busy_start > current_time:
-                # There's a free slot before this busy period
-                slots.append(f"{current_time.strftime('%I:%M %p')} - {busy_start.strftime('%I:%M %p')}")
-            
-            current_time = max(current_time, busy_end)
-        
-        # Check if there's time after the last busy period
-        if current_time < day_end:
-            slots.append(f"{current_time.strftime('%I:%M %p')} - {day_end.strftime('%I:%M %p')}")
+        windows.append((
+            current_date.replace(hour=BUSINESS_HOURS_START, minute=0, second=0, microsecond=0),
+            current_date.replace(hour=BUSINESS_HOURS_END, minute=0, second=0, microsecond=0),
+            current_date.date(),
+        ))
+    
+    available_slots = {}
+    first_window = 0
+    
+    def add_free(free_start: datetime, free_end: datetime):
+        """Record the parts of a free period that fall within business hours."""
+        nonlocal first_window
+        # Free periods arrive in order, so earlier windows are done
+        while first_window < len(windows) and windows[first_window][1] <= free_start:
+            first_window += 1
         
-        if slots:
-            available_slots[date_str] = slots
+        for day_start, day_end, day in windows[first_window:]:
+            if day_start >= free_end:
+                break
+            slot_start, slot_end = max(free_start, day_start), min(free_end, day_end)
+            if slot_start < slot_end:
+                available_slots.setdefault(day, []).append((slot_start, slot_end))
+    
+    # Sweep: everything between the end of the busy periods seen so far and
+    # the next busy start is free
+    busy_until = start_date
+    for busy_start, busy_end in busy_times:
+        if busy_start >= busy_end:
+            continue
+        if busy_start > busy_until:
+            add_free(busy_until, busy_start)
+        busy_until = max(busy_until, busy_end)
+    
+    if busy_until < end_date:
+        add_free(busy_until, end_date)
     
     return available_slots
 
 
-def _format_availability(available_slots: dict[str, list[str]]) -> str:
+@metrics.timed("format_availability_seconds", format="text")
+def _format_availability(available_slots: dict[date, list[tuple[datetime, datetime]]]) -> str:
     """Format available slots into a readable string."""
     if not available_slots:
-        return "❌ No available slots found for the next week."
+        return "❌ No available slots found."
     
     lines = ["🗓️ Available Schedule:\n"]
-    for date_str, slots in available_slots.items():
-        lines.append(f"📅 {date_str}:")
-        for slot in slots:
-            lines.append(f"   • {slot}")
+    for day, slots in available_slots.items():
+        lines.append(f"📅 {day.strftime('%A, %B %d')}:")
+        for slot_start, slot_end in slots:
+            lines.append(f"   • {slot_start.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}")
         lines.append("")
     
     return "\n".join(lines)
 
 
-def get_available_schedule(days: int = DAYS_TO_CHECK) -> str:
+@metrics.timed("format_availability_seconds", format="compact")
+def _format_availability_compact(available_slots: dict[date, list[tuple[datetime, datetime]]]) -> str:
+    """
+    Format available slots as compact JSON for the model.
+    
+    Free ranges are listed per ISO date in 24-hour time, e.g.
+    {"tz":"Asia/Manila","free":{"2026-01-05":["09:00-10:30","13:00-17:00"]}},
+    which is a fraction of the tokens of the readable listing.
+    """
+    return json.dumps(
+        {
+            'tz': TIMEZONE,
+            'free': {
+                day.isoformat(): [f"{slot_start:%H:%M}-{slot_end:%H:%M}" for slot_start, slot_end in slots]
+                for day, slots in available_slots.items()
+            },
+        },
+        separators=(',', ':'),
+    )
+
+
+@metrics.timed("slot_search_seconds")
+def find_available_slots(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    min_duration_minutes: int = 0,
+    time_of_day: str | None = None,
+    limit: int | None = None
+) -> list[tuple[datetime, datetime]]:
+    """
+    Search the busy times for the earliest free ranges matching a request.
+    
+    For example, the first free hour next Tuesday afternoon is
+    find_available_slots(tuesday, tuesday, 60, 'afternoon', limit=1). The
+    search walks the business hours day by day through a BusyIndex and stops
+    as soon as `limit` ranges are found, so it never formats or returns the
+    whole window.
+    
+    Args:
+        start_date: First date to search (default: today)
+        end_date: Last date to search, inclusive (default: DAYS_TO_CHECK days from start_date)
+        min_duration_minutes: Only return free ranges at least this long
+        time_of_day: Only search one of TIME_OF_DAY_HOURS ('morning' or 'afternoon')
+        limit: Maximum number of ranges to return (default: all)
+    
+    Returns:
+        Free (start, end) ranges within business hours, earliest first;
+        ranges already in the past are skipped
+        
+    Raises:
+        ValueError: If time_of_day is unknown, limit is below 1 or end_date
+            is before start_date
+        FileNotFoundError: If credentials.json is not found
+        Exception: For other calendar API errors
+    """
+    if time_of_day is not None and time_of_day not in TIME_OF_DAY_HOURS:
+        raise ValueError(f"time_of_day must be one of {', '.join(TIME_OF_DAY_HOURS)}, got {time_of_day!r}")
+    if limit is not None and limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+    
+    now = datetime.now()
+    start_date = start_date or now.date()
+    end_date = end_date or start_date + timedelta(days=DAYS_TO_CHECK - 1)
+    if end_date < start_date:
+        raise ValueError(f"End date ({end_date}) must not be before start date ({start_date})")
+    
+    first_hour, last_hour = TIME_OF_DAY_HOURS.get(time_of_day, (BUSINESS_HOURS_START, BUSINESS_HOURS_END))
+    min_duration = timedelta(minutes=min_duration_minutes)
+    
+    window_start = datetime.combine(start_date, time())
+    window_end = datetime.combine(end_date + timedelta(days=1), time())
+    busy = BusyIndex(_busy_snapshot(get_calendar_service(), window_start, window_end))
+    
+    found = []
+    day = start_date
+    while day <= end_date and (limit is None or len(found) < limit):
+        if day.weekday() < 5:  # Skip weekends
+            search_start = max(datetime.combine(day, time(first_hour)), now)
+            search_end = datetime.combine(day, time(last_hour))
+            for free_start, free_end in busy.free_gaps(search_start, search_end):
+                if free_end - free_start >= min_duration:
+                    found.append((free_start, free_end))
+                    if len(found) == limit:
+                        break
+        day += timedelta(days=1)
+    
+    return found
+
+
+def _upcoming_slots(
+    available_slots: dict[date, list[tuple[datetime, datetime]]],
+    now: datetime
+) -> dict[date, list[tuple[datetime, datetime]]]:
+    """
+    Drop the free ranges that are already over and trim the one in progress
+    to start now. Returns a new dict; memoized slots are never modified.
+    """
+    upcoming = {}
+    for day, slots in available_slots.items():
+        kept = [(max(slot_start, now), slot_end) for slot_start, slot_end in slots if slot_end > now]
+        if kept:
+            upcoming[day] = kept
+    return upcoming
+
+
+@metrics.timed("availability_seconds")
+def get_available_schedule(
+    days: int = DAYS_TO_CHECK,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    min_duration_minutes: int = 0,
+    time_of_day: str | None = None,
+    limit: int | None = None,
+    compact: bool = False
+) -> str:
     """
     Get available schedule from Google Calendar.
     
     This is the main public function for checking availability.
     It handles authentication, fetches busy times, calculates available slots,
-    and returns a formatted string.
+    and returns a formatted string. Busy times and slots are served from the
+    calendar mirror, which only calls the API on a cold start; the background
+    sync keeps it current.
+    
+    With a minimum duration, time of day or limit, only the matching ranges
+    found by find_available_slots() are listed. Either way the listing covers
+    the same dates and leaves out ranges that are already in the past.
     
     Args:
-        days: Number of days to check (default: DAYS_TO_CHECK)
+        days: Number of days to check (default: DAYS_TO_CHECK); 0 lists no slots
+        start_date: First date to check (default: today)
+        end_date: Last date to check, inclusive (overrides days)
+        min_duration_minutes: Only list free ranges at least this long
+        time_of_day: Only list 'morning' or 'afternoon' ranges
+        limit: List at most this many ranges, earliest first
+        compact: Return compact JSON (see _format_availability_compact())
+            instead of the readable listing
     
     Returns:
         Formatted string with available time slots
         
     Raises:
+        ValueError: If time_of_day is unknown, limit is below 1 or end_date
+            is before start_date
         FileNotFoundError: If credentials.json is not found
         Exception: For other calendar API errors
     """
+    format_slots = _format_availability_compact if compact else _format_availability
+    
+    if limit is not None and limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+    if end_date is None and days < 1:
+        return format_slots({})  # An empty window has no slots
+    
+    # Both paths list the same date range and skip ranges already in the past
+    now = datetime.now()
+    first_date = start_date or now.date()
+    last_date = end_date or first_date + timedelta(days=days - 1)
+    if last_date < first_date:
+        raise ValueError(f"End date ({last_date}) must not be before start date ({first_date})")
+    
+    if min_duration_minutes or time_of_day or limit is not None:
+        available_slots = {}
+        for slot_start, slot_end in find_available_slots(
+            first_date, last_date, min_duration_minutes, time_of_day, limit
+        ):
+            available_slots.setdefault(slot_start.date(), []).append((slot_start, slot_end))
+        return format_slots(available_slots)
+    
     # Get the calendar service
     service = get_calendar_service()
     
     # Define the time range to check
+    days = (last_date - first_date).days + 1
+    start_date = datetime.combine(first_date, time())
+    
+    if AVAILABILITY_BACKEND == 'freebusy':
+        # Lightweight uncached lookup: start/end pairs only
+        end_date = start_date + timedelta(days=days)
+        busy_times = _get_busy_times_freebusy(service, ['primary'], start_date, end_date)['primary']
+        available_slots = _calculate_available_slots(busy_times, start_date, days)
+    elif AVAILABILITY_BACKEND == 'events':
+        # Uncached lookup streamed page by page into the slot calculation
+        end_date = start_date + timedelta(days=days)
+        busy_times = _get_busy_times(service, start_date, end_date)
+        available_slots = _calculate_available_slots(busy_times, start_date, days)
+    elif AVAILABILITY_BACKEND == 'cache':
+        # Busy times come from the in-process cache, which only fetches changed
+        # events from the calendar once its TTL has passed
+        available_slots = availability_cache.available_slots(
+            service, 'primary', start_date, days, _calculate_available_slots
+        )
+    else:
+        # Busy times come from the SQLite mirror; no API call unless it was never synced
+        mirror = _covering_mirror(service, start_date, start_date + timedelta(days=days))
+        available_slots = mirror.available_slots('primary', start_date, days, _calculate_available_slots)
+    
+    # Format and return the availability
+    return format_slots(_upcoming_slots(available_slots, now))
+
+
+def find_staff_availability(
+    calendar_ids: list[str],
+    duration_minutes: int = 60,
+    min_free: int = 1,
+    days: int = DAYS_TO_CHECK,
+    limit: int = 1,
+) -> list[tuple[datetime, datetime, list[str]]]:
+    """
+    Find the earliest slots when enough staff calendars are free at once.
+    
+    For example, the earliest 60-minute slot when any 2 of 5 staff are free
+    is find_staff_availability(staff_ids, duration_minutes=60, min_free=2).
+    
+    Args:
+        calendar_ids: Staff calendar IDs to consider
+        duration_minutes: Length of the appointment
+        min_free: How many of the calendars must be free for the whole slot
+        days: Number of days to check (default: DAYS_TO_CHECK)
+        limit: Maximum number of slots to return
+    
+    Returns:
+        List of (start, end, free calendar IDs), earliest first
+        
+    Raises:
+        FileNotFoundError: If credentials.json is not found
+        Exception: For other calendar API errors
+    """
+    service = get_calendar_service()
+    
     now = datetime.now()
     start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
     end_date = start_date + timedelta(days=days)
     
-    # Fetch busy times from calendar
-    busy_times = _get_busy_times(service, start_date, end_date)
+    # Imported here: NumPy is only needed for multi-calendar searches
+    from services.availability_bitmap import AvailabilityGrid
     
-    # Calculate available slots
-    available_slots = _calculate_available_slots(busy_times, start_date, days)
+    # One batched FreeBusy request covers all staff calendars
+    busy_by_calendar = _get_busy_times_freebusy(service, calendar_ids, start_date, end_date)
     
-    # Format and return the availability
-    return _format_availability(available_slots)
+    grid = AvailabilityGrid.from_busy_times(
+        busy_by_calendar, start_date, days, BUSINESS_HOURS_START, BUSINESS_HOURS_END
+    )
+    return grid.find_slots(duration_minutes, min_free=min_free, not_before=now, limit=limit)
 
 
 def validate_and_fix_datetime(dt: datetime) -> datetime:
@@ -255,22 +615,65 @@ def validate_and_fix_datetime(dt: datetime) -> datetime:
     return dt
 
 
-def create_calendar_event(
+def _build_event_body(
     summary: str,
     description: str,
     start_time: datetime,
     end_time: datetime,
     attendee_email: str = None
+) -> dict:
+    """Build the events().insert body for an appointment."""
+    event = {
+        'summary': summary,
+        'description': description,
+        'start': {
+            'dateTime': start_time.isoformat(),
+            'timeZone': TIMEZONE,
+        },
+        'end': {
+            'dateTime': end_time.isoformat(),
+            'timeZone': TIMEZONE,
+        },
+        'reminders': {
+            'useDefault': False,
+            'overrides': [
+                {'method': 'email', 'minutes': 24 * 60},  # 1 day before
+                {'method': 'popup', 'minutes': 30},       # 30 min before
+            ],
+        },
+    }
+    
+    # Add attendee if provided
+    if attendee_email:
+        event['attendees'] = [{'email': attendee_email}]
+    
+    return event
+
+
+def create_calendar_event(
+    summary: str,
+    description: str,
+    start_time: datetime,
+    end_time: datetime,
+    attendee_email: str = None,
+    lease_holder: str | None = None
 ) -> dict:
     """
     Create a calendar event.
     
+    With a lease_holder, the slot is leased for the duration of the call and
+    checked against the local busy times first, so concurrent bookings of
+    the same slot cannot both be inserted. The check adds no API call once
+    the calendar mirror is warm.
+    
     Args:
         summary: Event title
         description: Event description
         start_time: Event start datetime
         end_time: Event end datetime
         attendee_email: Optional email for attendee
+        lease_holder: Conversation booking the slot (e.g. the session ID);
+            None skips the conflict check
     
     Returns:
         Created event object from Google Calendar API
@@ -278,6 +681,7 @@ def create_calendar_event(
     Raises:
         FileNotFoundError: If credentials.json is not found
         ValueError: If the appointment time is in the past
+        SlotUnavailableError: If the slot is already booked or being booked
         Exception: For calendar API errors
     """
     # Validate and fix datetimes
@@ -290,34 +694,215 @@ def create_calendar_event(
     
     service = get_calendar_service()
     
-    event = {
-        'summary': summary,
-        'description': description,
-        'start': {
-            'dateTime': start_time.isoformat(),
-            'timeZone': TIMEZONE,
-        },
-        'end': {
-            'dateTime': end_time.isoformat(),
-            'timeZone': TIMEZONE,
-        },
-        'reminders': {
-            'useDefault': False,
-            'overrides': [
-                {'method': 'email', 'minutes': 24 * 60},  # 1 day before
-                {'method': 'popup', 'minutes': 30},       # 30 min before
-            ],
-        },
-    }
+    lease = None
+    if lease_holder is not None:
+        lease = slot_leases.acquire(lease_holder, start_time, end_time)
+        if lease is None:
+            raise SlotUnavailableError(f"{start_time} - {end_time} is being booked by another customer")
     
-    # Add attendee if provided
-    if attendee_email:
-        event['attendees'] = [{'email': attendee_email}]
+    try:
+        if lease is not None and _busy_snapshot(service, start_time, end_time):
+            raise SlotUnavailableError(f"{start_time} - {end_time} overlaps an existing booking")
+        
+        event = _build_event_body(summary, description, start_time, end_time, attendee_email)
+        
+        with api_call('events.insert'):
+            created_event = service.events().insert(
+                calendarId='primary',
+                body=event,
+                sendUpdates='all' if attendee_email else 'none'
+            ).execute()
+        
+        # Write through so the booking is visible to availability checks immediately
+        _write_through(created_event)
+    except BaseException:
+        if lease is not None:
+            slot_leases.release(lease)
+        raise
     
-    created_event = service.events().insert(
-        calendarId='primary',
-        body=event,
-        sendUpdates='all' if attendee_email else 'none'
-    ).execute()
+    if lease is not None:
+        slot_leases.commit(lease)  # The mirror now guards the slot
     
     return created_event
+
+
+def create_calendar_events_bulk(
+    items: list[dict],
+    allow_conflicts: bool = False
+) -> list[dict]:
+    """
+    Create many calendar events using Google HTTP batch requests.
+    
+    Every item is validated like create_calendar_event() and checked for
+    conflicts against one availability snapshot (including the other items
+    in the same call). Valid items are inserted in batches of up to
+    BATCH_MAX_REQUESTS, so an import costs a handful of round-trips instead
+    of one per appointment.
+    
+    Args:
+        items: Dicts with the create_calendar_event() arguments
+            (summary, description, start_time, end_time, optional attendee_email)
+        allow_conflicts: Book items even if they overlap existing events
+    
+    A batch that fails as a whole (HTTP or transport error) marks its
+    unanswered items as 'error' and the remaining batches still run.
+    
+    Returns:
+        One result per item, in input order, with keys:
+            index: Position of the item in `items`
+            status: 'created', 'invalid', 'conflict' or 'error'
+            event: Created event object (when status is 'created')
+            error: Reason the item was not created (otherwise)
+        
+    Raises:
+        FileNotFoundError: If credentials.json is not found
+        Exception: For calendar API errors outside of individual inserts
+    """
+    from googleapiclient.errors import HttpError
+    from httplib2 import HttpLib2Error
+    
+    results = [{'index': i, 'status': None, 'event': None, 'error': None} for i in range(len(items))]
+    pending = []  # (index, start_time, end_time, body, attendee_email)
+    
+    # Validate every item first
+    for i, item in enumerate(items):
+        try:
+            if not isinstance(item['start_time'], datetime) or not isinstance(item['end_time'], datetime):
+                raise TypeError("start_time and end_time must be datetimes")
+            start_time = validate_and_fix_datetime(item['start_time'])
+            end_time = validate_and_fix_datetime(item['end_time'])
+            if end_time <= start_time:
+                raise ValueError(f"End time ({end_time}) must be after start time ({start_time})")
+            body = _build_event_body(
+                item['summary'],
+                item.get('description', ''),
+                start_time,
+                end_time,
+                item.get('attendee_email'),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            results[i].update(status='invalid', error=str(e))
+            continue
+        pending.append((i, start_time, end_time, body, item.get('attendee_email')))
+    
+    if not pending:
+        return results
+    
+    service = get_calendar_service()
+    
+    # Check conflicts against a single snapshot of the calendar
+    if not allow_conflicts:
+        window_start = min(start for _, start, _, _, _ in pending)
+        window_end = max(end for _, _, end, _, _ in pending)
+        snapshot = BusyIndex(_busy_snapshot(service, window_start, window_end))
+        
+        accepted = []
+        for entry in sorted(pending, key=lambda entry: entry[1]):
+            i, start_time, end_time = entry[:3]
+            if snapshot.is_free(start_time, end_time):
+                snapshot.add(start_time, end_time)  # Later items must not overlap it
+                accepted.append(entry)
+            else:
+                results[i].update(status='conflict', error=f"{start_time} - {end_time} overlaps an existing booking")
+        pending = sorted(accepted, key=lambda entry: entry[0])
+    
+    def on_response(request_id, response, exception):
+        i = int(request_id)
+        if exception is not None:
+            results[i].update(status='error', error=str(exception))
+        else:
+            results[i].update(status='created', event=response)
+            _write_through(response)
+    
+    # Submit the inserts in batches
+    for first in range(0, len(pending), BATCH_MAX_REQUESTS):
+        batch = service.new_batch_http_request(callback=on_response)
+        for i, _, _, body, attendee_email in pending[first:first + BATCH_MAX_REQUESTS]:
+            batch.add(
+                service.events().insert(
+                    calendarId='primary',
+                    body=body,
+                    sendUpdates='all' if attendee_email else 'none'
+                ),
+                request_id=str(i),
+            )
+        try:
+            with api_call('batch'):
+                batch.execute()
+        except (HttpError, HttpLib2Error, OSError) as e:
+            # Keep the results of earlier batches; report this batch's unanswered items
+            logger.exception("Calendar batch of %d inserts failed", len(pending[first:first + BATCH_MAX_REQUESTS]))
+            for i, *_ in pending[first:first + BATCH_MAX_REQUESTS]:
+                if results[i]['status'] is None:
+                    results[i].update(status='error', error=f"Batch request failed: {e}")
+    
+    return results
+
+
+# --------- Async API ----------
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the bounded thread pool used to run blocking Calendar API calls."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=CALENDAR_IO_WORKERS,
+            thread_name_prefix='calendar-io',
+        )
+    return _executor
+
+
+async def _run_blocking(func, *args, **kwargs):
+    """Run a blocking Calendar call on the I/O pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def get_available_schedule_async(
+    days: int = DAYS_TO_CHECK,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    min_duration_minutes: int = 0,
+    time_of_day: str | None = None,
+    limit: int | None = None,
+    compact: bool = False
+) -> str:
+    """
+    Async variant of get_available_schedule().
+    
+    The Google HTTP round-trips run on a bounded thread pool, so other
+    conversations keep making progress while this one waits on the calendar.
+    """
+    return await _run_blocking(
+        get_available_schedule,
+        days=days,
+        start_date=start_date,
+        end_date=end_date,
+        min_duration_minutes=min_duration_minutes,
+        time_of_day=time_of_day,
+        limit=limit,
+        compact=compact,
+    )
+
+
+async def create_calendar_event_async(
+    summary: str,
+    description: str,
+    start_time: datetime,
+    end_time: datetime,
+    attendee_email: str = None,
+    lease_holder: str | None = None
+) -> dict:
+    """Async variant of create_calendar_event(). See get_available_schedule_async()."""
+    return await _run_blocking(
+        create_calendar_event,
+        summary=summary,
+        description=description,
+        start_time=start_time,
+        end_time=end_time,
+        attendee_email=attendee_email,
+        lease_holder=lease_holder,
+    )
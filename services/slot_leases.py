@@ -0,0 +1,143 @@
+"""
+Short-lived leases on appointment time slots.
+
+The Calendar API does not reject overlapping inserts, so two conversations
+confirming the same slot at once would both succeed. Before a booking is
+inserted, the conversation takes a lease on its interval; a second
+conversation asking for an overlapping interval is refused until the first
+one commits (the event is then in the calendar mirror) or releases it.
+Leases expire on their own, so a crashed turn never blocks a slot for long.
+
+Leases held by different holders never overlap, so they are kept as one
+sorted list of disjoint intervals and checked with a binary search.
+"""
+
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+
+from core.metrics import metrics
+
+# --------- Configuration ----------
+LEASE_TTL_SECONDS = 120  # How long an unconfirmed lease holds a slot
+
+
+@dataclass(frozen=True)
+class SlotLease:
+    """A hold on [start, end) by one conversation."""
+    holder: str
+    start: datetime
+    end: datetime
+    expires_at: float  # time.monotonic()
+
+
+class SlotLeaseManager:
+    """Thread-safe registry of slot leases."""
+
+    def __init__(self, ttl_seconds: float = LEASE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._starts: list[datetime] = []   # Sorted; parallel to _leases
+        self._leases: list[SlotLease] = []
+        self._expiries: list[tuple[float, datetime]] = []  # Min-heap of (expires_at, start)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._leases)
+
+    # --------- Maintenance ----------
+
+    def _expire(self) -> None:
+        """Drop leases past their expiry. Must be called with the lock held."""
+        now = time.monotonic()
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, start = heapq.heappop(self._expiries)
+            i = bisect_left(self._starts, start)
+            # The lease may have been released or renewed since
+            if i < len(self._starts) and self._starts[i] == start and self._leases[i].expires_at == expires_at:
+                del self._starts[i]
+                del self._leases[i]
+
+    def _overlapping(self, start: datetime, end: datetime) -> range:
+        """Positions of the leases overlapping [start, end). Must be called with the lock held."""
+        # Leases are disjoint, so their ends are sorted like their starts
+        first = bisect_right(self._starts, start)
+        if first > 0 and self._leases[first - 1].end > start:
+            first -= 1
+        return range(first, bisect_left(self._starts, end))
+
+    # --------- Leases ----------
+
+    def acquire(self, holder: str, start: datetime, end: datetime, ttl_seconds: float | None = None) -> SlotLease | None:
+        """
+        Lease [start, end) for a holder.
+
+        Leases the holder already has on overlapping intervals are replaced,
+        so offering a slot and then confirming it renews the same hold.
+
+        Args:
+            holder: Conversation taking the lease (e.g. the session ID)
+            start: Start of the slot
+            end: End of the slot
+            ttl_seconds: Lease lifetime (default: the manager's TTL)
+
+        Returns:
+            The new lease, or None if another holder has an overlapping lease
+        """
+        if start >= end:
+            raise ValueError(f"End time ({end}) must be after start time ({start})")
+
+        with self._lock:
+            self._expire()
+            overlapping = self._overlapping(start, end)
+            if any(self._leases[i].holder != holder for i in overlapping):
+                metrics.inc("slot_leases_total", outcome="conflict")
+                return None
+
+            expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+            lease = SlotLease(holder, start, end, expires_at)
+            self._starts[overlapping.start:overlapping.stop] = [start]
+            self._leases[overlapping.start:overlapping.stop] = [lease]
+            heapq.heappush(self._expiries, (expires_at, start))
+
+        metrics.inc("slot_leases_total", outcome="acquired")
+        return lease
+
+    def release(self, lease: SlotLease) -> bool:
+        """
+        Give up a lease, e.g. when the booking failed or the customer declined.
+
+        Returns:
+            True if the lease was still held
+        """
+        with self._lock:
+            i = bisect_left(self._starts, lease.start)
+            if i < len(self._leases) and self._leases[i] == lease:
+                del self._starts[i]
+                del self._leases[i]
+                return True
+            return False
+
+    def commit(self, lease: SlotLease) -> bool:
+        """
+        Drop a lease whose booking was created.
+
+        Call this only after the event is visible to availability checks
+        (written through to the calendar mirror), so the slot is never
+        unguarded in between.
+        """
+        metrics.inc("slot_leases_total", outcome="committed")
+        return self.release(lease)
+
+    def is_leased(self, start: datetime, end: datetime, holder: str | None = None) -> bool:
+        """Whether [start, end) overlaps a lease held by anyone other than `holder`."""
+        with self._lock:
+            self._expire()
+            return any(self._leases[i].holder != holder for i in self._overlapping(start, end))
+
+
+slot_leases = SlotLeaseManager()
@@ -0,0 +1,47 @@
+"""
+Tests for the booking abuse pre-classifier's booking request counting.
+
+Run with:
+    uv run python -m unittest discover tests
+"""
+
+import unittest
+
+from guardrails.booking_ledger import BookingLedger
+from guardrails.input.pre_classifier import BookingPreClassifier
+
+
+class BookingRequestCountingTest(unittest.TestCase):
+    def setUp(self):
+        self.ledger = BookingLedger()
+        self.classifier = BookingPreClassifier(self.ledger)
+
+    def test_availability_questions_are_not_booking_requests(self):
+        for text in [
+            "Do you have any slots on Monday?",
+            "What slots are open Tuesday?",
+            "What's your schedule on Monday?",
+            "Is there an appointment free tomorrow?",
+            "Any availability next week?",
+        ]:
+            with self.subTest(text=text):
+                self.assertIsNotNone(self.classifier.classify("session", text))
+        self.assertEqual(self.ledger.attempts("session"), 0)
+
+    def test_booking_requests_are_counted(self):
+        for text in [
+            "Book me for 2pm tomorrow",
+            "Book 2026-10-20 10:00 for 60 minutes. Name: Ann Lee",
+            "I'd like to schedule an appointment",
+        ]:
+            self.classifier.classify("session", text)
+        self.assertEqual(self.ledger.attempts("session"), 3)
+
+    def test_repeated_booking_requests_are_escalated(self):
+        for _ in range(self.classifier.max_cleared_booking_requests):
+            self.assertIsNotNone(self.classifier.classify("session", "Can I book for Friday?"))
+        self.assertIsNone(self.classifier.classify("session", "Can I book for Friday?"))
+
+
+if __name__ == "__main__":
+    unittest.main()